@@ -2,13 +2,9 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 from typing import Optional
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-
-# MongoDB connection setup
-MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+from utils.database import pool_stats
+from utils.cache import guild_cache
+from utils.data import get_guild
 
 async def guild_param_autocomplete(interaction: discord.Interaction, current: str):
     """Autocomplete for guild parameters."""
@@ -56,15 +52,15 @@ class AdminCommands(commands.Cog):
                     "leaderboard": str(leaderboard_channel.id),
                     "verification": str(verification_channel.id),
                 },
-                "role_id": str(member_role.id),
-                "members": {}
+                "role_id": str(member_role.id)
             }
 
-            existing_guild = await db.guilds.find_one({"_id": name})
+            existing_guild = await get_guild(name)
             if existing_guild:
                 raise ValueError(f"Guild {name} already exists")
 
-            await db.guilds.insert_one(guild)
+            await self.bot.db.guilds.insert_one(guild)
+            guild_cache.upsert_guild(guild)
             await interaction.response.send_message(f"Successfully created guild: {name}")
         except ValueError as e:
             await interaction.response.send_message(f"Error: {str(e)}", ephemeral=True)
@@ -86,7 +82,7 @@ class AdminCommands(commands.Cog):
             return
 
         try:
-            guild = await db.guilds.find_one({"_id": name})
+            guild = await get_guild(name)
             if not guild:
                 raise ValueError(f"Guild {name} does not exist")
 
@@ -94,11 +90,13 @@ class AdminCommands(commands.Cog):
                 if not new_channel:
                     raise ValueError("Channel parameter requires a new channel")
                 update_field = f"channels.{param}"
-                await db.guilds.update_one({"_id": name}, {"$set": {update_field: str(new_channel.id)}})
+                await self.bot.db.guilds.update_one({"_id": name}, {"$set": {update_field: str(new_channel.id)}})
+                guild_cache.set_guild_field(name, update_field, str(new_channel.id))
             elif param == "role_id":
                 if not new_role:
                     raise ValueError("Role parameter requires a new role")
-                await db.guilds.update_one({"_id": name}, {"$set": {"role_id": str(new_role.id)}})
+                await self.bot.db.guilds.update_one({"_id": name}, {"$set": {"role_id": str(new_role.id)}})
+                guild_cache.set_guild_field(name, "role_id", str(new_role.id))
             else:
                 raise ValueError(f"Invalid parameter: {param}")
 
@@ -106,6 +104,34 @@ class AdminCommands(commands.Cog):
         except ValueError as e:
             await interaction.response.send_message(f"Error: {str(e)}", ephemeral=True)
 
+    @app_commands.guilds(discord.Object(id=1140429772531449886))
+    @app_commands.command()
+    async def db_stats(self, interaction: discord.Interaction):
+        """Show MongoDB connection pool statistics."""
+        if not await self.has_permissions(interaction):
+            await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
+            return
+
+        stats = pool_stats()
+        lines = [f"**{key}:** {value}" for key, value in stats.items()]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.guilds(discord.Object(id=1140429772531449886))
+    @app_commands.command()
+    async def pending_stats(self, interaction: discord.Interaction):
+        """Show verification queue depth, expiry, reaction filter and OCR worker counts."""
+        if not await self.has_permissions(interaction):
+            await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
+            return
+
+        stats = self.bot.pending.stats()
+        member_cog = self.bot.get_cog("MemberCommands")
+        if member_cog:
+            stats.update({f"reactions_{key}": value for key, value in member_cog.reaction_stats.items()})
+        stats.update({f"ocr_{key}": value for key, value in self.bot.ocr.stats().items()})
+        lines = [f"**{key}:** {value}" for key, value in stats.items()]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
 async def setup(bot: commands.Bot):
     """Registers the cog with the bot."""
     await bot.add_cog(AdminCommands(bot))
@@ -1,30 +1,75 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
-from motor.motor_asyncio import AsyncIOMotorClient
 import logging
-import os
-from utils.leaderboard_chrome import create_damage_board
+import io
+from utils.render_service import RenderService
+from utils.leaderboard_common import get_player_stats, board_cache_key
+from utils.scheduling import RefreshScheduler
+from utils.config import get_setting
+from utils.data import load_all_guild_data, load_leaderboard_data
+from utils.rankings import BOARDS
 
 logger = logging.getLogger('discord')
 
-# MongoDB connection setup
-MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+async def board_autocomplete(interaction: discord.Interaction, current: str):
+    return [
+        app_commands.Choice(name=board, value=board)
+        for board in BOARDS if current.lower() in board.lower()
+    ]
 
 class LeaderboardCog(commands.Cog):
+    leaderboard_group = app_commands.Group(
+        name="leaderboard",
+        description="Leaderboard commands"
+    )
+
     def __init__(self, bot):
         self.bot = bot
         self.messages = {}
+        self.renderer = RenderService()
+        if self.renderer.name == "chrome":
+            from utils.leaderboard_chrome import precompile_templates
+            precompile_templates()
+        # guild name -> content key of the image currently posted for it
+        self.board_keys = {}
+        self.cache_stats = {"hits": 0, "misses": 0}
+        # guild name -> PartialMessage for the posted board (edited by id, never fetched)
+        self.handles = {}
+        self.api_stats = {"refreshes": 0, "edits": 0, "sends": 0, "deletes": 0, "recreated": 0}
+        self.scheduler = RefreshScheduler(
+            self.refresh_guild,
+            window=get_setting("leaderboard", "refresh_window_seconds", 5)
+        )
+
+    async def cog_load(self):
+        # Stored board ids let the first refresh after a restart edit in place
+        await self.load_message_ids()
+
+    def cog_unload(self):
+        self.scheduler.cancel_all()
+        self.renderer.shutdown()
+
+    def schedule_refresh(self, guild_name: str):
+        """Mark a guild's leaderboard dirty; refreshes within the window are coalesced."""
+        self.scheduler.mark_dirty(guild_name)
+
+    async def refresh_guild(self, guild_name: str):
+        """Re-render a guild's leaderboard from its current top rows (indexed, pre-sorted)."""
+        guild_data = await load_leaderboard_data(guild_name)
+        if not guild_data:
+            logger.error(f"Guild {guild_name} not found, skipping leaderboard refresh")
+            return
+        await self.update_guild_leaderboard(guild_name, guild_data)
 
     async def load_message_ids(self):
         """Load saved message IDs from MongoDB."""
-        records = await db.leaderboard_messages.find().to_list(None)
+        records = await self.bot.db.leaderboard_messages.find().to_list(None)
         self.messages = {record["_id"]: record["message_id"] for record in records}
 
     async def save_message_id(self, guild_name: str, message_id: str):
         """Save a message ID to MongoDB."""
-        await db.leaderboard_messages.update_one(
+        await self.bot.db.leaderboard_messages.update_one(
             {"_id": guild_name},
             {"$set": {"message_id": message_id}},
             upsert=True
@@ -39,12 +84,74 @@ class LeaderboardCog(commands.Cog):
             return f"{damage / 1_000_000_000:.2f}B"
         return str(damage)
 
+    @leaderboard_group.command(name="global")
+    @app_commands.autocomplete(board=board_autocomplete)
+    async def leaderboard_global(self, interaction: discord.Interaction, board: str = "total"):
+        """Show the top 25 members across every guild, by total or per boss."""
+        board = board.lower()
+        if board not in BOARDS:
+            await interaction.response.send_message(f"Board must be one of: {', '.join(BOARDS)}", ephemeral=True)
+            return
+
+        top = self.bot.cache.global_top(board, 25)
+        if not top:
+            await interaction.response.send_message("No members have been ranked yet.", ephemeral=True)
+            return
+
+        lines = [
+            f"**{rank}.** {name} ({guild}) - {self.format_damage(score)}"
+            for rank, name, guild, score in top
+        ]
+        embed = discord.Embed(
+            title=f"Global Leaderboard - {board.upper()}",
+            description="\n".join(lines),
+            color=discord.Color.gold()
+        )
+        await interaction.response.send_message(embed=embed)
+
+    def get_handle(self, guild_name: str, channel):
+        """The cached PartialMessage for a guild's board, built from its stored id if needed."""
+        handle = self.handles.get(guild_name)
+        if handle is None and guild_name in self.messages:
+            handle = channel.get_partial_message(int(self.messages[guild_name]))
+            self.handles[guild_name] = handle
+        return handle
+
+    async def post_board(self, guild_name: str, channel, png_bytes: bytes, board_key: str):
+        """Send a new board message, remember its handle and id, and drop any stale one."""
+        file = discord.File(io.BytesIO(png_bytes), filename=f"leaderboard_{guild_name}.png")
+        self.api_stats["sends"] += 1
+        message = await channel.send(file=file)
+
+        old_message_id = self.messages.get(guild_name)
+        if old_message_id and int(old_message_id) != message.id:
+            try:
+                self.api_stats["deletes"] += 1
+                await channel.get_partial_message(int(old_message_id)).delete()
+                logger.info(f"Deleted old leaderboard message for {guild_name}")
+            except (discord.NotFound, discord.HTTPException):
+                pass
+
+        self.messages[guild_name] = str(message.id)
+        self.handles[guild_name] = channel.get_partial_message(message.id)
+        self.board_keys[guild_name] = board_key
+        await self.save_message_id(guild_name, str(message.id))
+
+    @leaderboard_group.command(name="stats")
+    async def leaderboard_stats(self, interaction: discord.Interaction):
+        """Show render cache hits, collapsed refreshes and Discord API calls per leaderboard refresh."""
+        stats = dict(self.cache_stats, **self.api_stats)
+        calls = self.api_stats["edits"] + self.api_stats["sends"] + self.api_stats["deletes"]
+        refreshes = self.api_stats["refreshes"]
+        stats["api_calls_per_refresh"] = round(calls / refreshes, 2) if refreshes else 0
+        stats.update({f"scheduler_{key}": value for key, value in self.scheduler.stats().items()})
+        stats.update({f"render_{key}": value for key, value in self.renderer.stats().items()})
+        lines = [f"**{key}:** {value}" for key, value in stats.items()]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
     async def load_guilds(self) -> dict:
-        """Load all guilds from MongoDB."""
-        guilds = {}
-        async for guild in db.guilds.find():
-            guilds[guild["_id"]] = guild
-        return guilds
+        """Load all guilds (with their members) from MongoDB."""
+        return await load_all_guild_data()
 
     async def initialize_leaderboards(self):
         logger.info("Initializing leaderboards...")
@@ -60,25 +167,16 @@ class LeaderboardCog(commands.Cog):
                     continue
 
                 if guild_name in self.messages:
-                    try:
-                        # Attempt to fetch the existing leaderboard message
-                        await channel.fetch_message(int(self.messages[guild_name]))
-                        logger.info(f"Found existing leaderboard for {guild_name}")
-                        continue
-                    except (discord.NotFound, discord.HTTPException):
-                        logger.info(f"Stored message for {guild_name} not found, creating new one")
+                    # Trust the stored id; a deleted message is recreated on its first edit
+                    self.get_handle(guild_name, channel)
+                    logger.info(f"Using stored leaderboard message for {guild_name}")
+                    continue
 
                 # ---------------- NEW IMAGE GENERATION ----------------
-                # Create the damage board image (and HTML if needed).
-                screenshot_path, html_path = create_damage_board(guild_name, guild_data)
-                
-                # Send the generated image in a new message.
-                file = discord.File(screenshot_path, filename=os.path.basename(screenshot_path))
-                message = await channel.send(file=file)
-                
-                # Store the new message ID for future edits
-                self.messages[guild_name] = str(message.id)
-                await self.save_message_id(guild_name, str(message.id))
+                # Render the damage board to in-memory PNG bytes.
+                board_key = board_cache_key(self.renderer.name, guild_name, get_player_stats(guild_data))
+                png_bytes = await self.renderer.render(guild_name, guild_data)
+                await self.post_board(guild_name, channel, png_bytes, board_key)
 
                 logger.info(f"Created leaderboard image for {guild_name} in channel {channel_id}")
 
@@ -93,48 +191,38 @@ class LeaderboardCog(commands.Cog):
                 logger.error(f"Channel {channel_id} not found for guild {guild_name}")
                 return
 
+            # Skip Chrome and the Discord edit if the posted image already shows these rows
+            board_key = board_cache_key(self.renderer.name, guild_name, get_player_stats(guild_data))
+            if guild_name in self.messages and self.board_keys.get(guild_name) == board_key:
+                self.cache_stats["hits"] += 1
+                logger.info(f"Leaderboard for {guild_name} unchanged, skipping render")
+                return
+            self.cache_stats["misses"] += 1
+
             # ---------------- NEW IMAGE GENERATION ----------------
-            # Create the damage board image (and HTML if needed).
-            screenshot_path, html_path = create_damage_board(guild_name, guild_data)
+            # Render the damage board to in-memory PNG bytes.
+            png_bytes = await self.renderer.render(guild_name, guild_data)
 
-            # Retrieve the message ID if it exists
-            message = None
-            if guild_name in self.messages:
+            self.api_stats["refreshes"] += 1
+            handle = self.get_handle(guild_name, channel)
+            if handle:
                 try:
-                    message = await channel.fetch_message(int(self.messages[guild_name]))
-                except (discord.NotFound, discord.HTTPException):
+                    # Edit by id: one request, no fetch
+                    file = discord.File(io.BytesIO(png_bytes), filename=f"leaderboard_{guild_name}.png")
+                    self.api_stats["edits"] += 1
+                    await handle.edit(content="", attachments=[file])
+                    self.board_keys[guild_name] = board_key
+                    logger.info(f"Updated existing leaderboard image for {guild_name}")
+                    return
+                except discord.NotFound:
                     logger.info(f"Stored message for {guild_name} not found, will create a new one")
-                    message = None  # Message does not exist anymore
-
-            # Prepare the new leaderboard file
-            file = discord.File(screenshot_path, filename=os.path.basename(screenshot_path))
-
-            if message:
-                # ✅ Edit the existing message instead of creating a new one
-                await message.edit(content="", attachments=[file])
-                logger.info(f"Updated existing leaderboard image for {guild_name}")
-            else:
-                # ✅ Send a new message if none exists
-                new_message = await channel.send(file=file)
-
-                # 🔹 Get the last few messages in the channel to check for outdated leaderboard messages
-                messages = [msg async for msg in channel.history(limit=5)]  # Fetch recent messages
-                most_recent_message = messages[0] if messages else None  # Latest message in channel
-
-                # 🔹 If an old message exists and is NOT the most recent, delete it
-                old_message_id = self.messages.get(guild_name)
-                if old_message_id and most_recent_message and int(old_message_id) != most_recent_message.id:
-                    try:
-                        old_message = await channel.fetch_message(int(old_message_id))
-                        await old_message.delete()
-                        logger.info(f"Deleted old leaderboard message for {guild_name} (not most recent)")
-                    except (discord.NotFound, discord.HTTPException):
-                        logger.info(f"Old leaderboard message for {guild_name} not found, skipping deletion")
-
-                # Store the new message ID for future updates
-                self.messages[guild_name] = str(new_message.id)
-                await self.save_message_id(guild_name, str(new_message.id))
-                logger.info(f"Created new leaderboard image for {guild_name}")
+                    # Forget the dead id too, so the new post doesn't try to delete it
+                    self.handles.pop(guild_name, None)
+                    self.messages.pop(guild_name, None)
+                    self.api_stats["recreated"] += 1
+
+            await self.post_board(guild_name, channel, png_bytes, board_key)
+            logger.info(f"Created new leaderboard image for {guild_name}")
 
         except Exception as e:
             logger.error(f"Error updating leaderboard for {guild_name}: {e}")
@@ -156,4 +244,9 @@ class LeaderboardCog(commands.Cog):
 '''
 
 async def setup(bot):
-    await bot.add_cog(LeaderboardCog(bot))
+    leaderboard_cog = LeaderboardCog(bot)
+    await bot.add_cog(leaderboard_cog)
+    bot.tree.add_command(
+        leaderboard_cog.leaderboard_group,
+        guild=discord.Object(id=1140429772531449886)
+    )
@@ -1,6 +1,7 @@
 from discord.ext import commands
 from discord import app_commands
 import discord
+import asyncio
 import logging
 from typing import Optional
 from utils.data import (
@@ -9,17 +10,25 @@ from utils.data import (
     update_member_data,
     find_guild_by_member,
     find_guild_by_channel,
-    parse_damage_input
+    parse_damage_input,
+    search_member_names
 )
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from utils.config import get_setting
+from utils.ocr_pool import OcrQueueFull
+from utils.damage_check import damage_matches
 
 logger = logging.getLogger(__name__)
 
-# MongoDB connection setup
-MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+APPROVE_EMOJI = "✅"
+REJECT_EMOJI = "❌"
+REVIEW_EMOJIS = frozenset((APPROVE_EMOJI, REJECT_EMOJI))
+
+# Boss names as printed on the result screen -> command codes
+OCR_BOSS_CODES = {
+    "Red Velvet Dragon": "rvd",
+    "Avatar of Destiny": "aod",
+    "Living Abyss": "la"
+}
 
 def format_damage(value) -> tuple:
     if not isinstance(value, tuple) or len(value) != 2:
@@ -43,14 +52,10 @@ async def member_autocomplete(interaction: discord.Interaction, current: str):
     print(f"Autocomplete triggered. Input: '{current}'")
     try:
         # Fetch members from MongoDB
-        guilds = await db.guilds.find().to_list(None)
-        members = [
-            member for guild in guilds
-            for member in guild.get("members", {}).keys()
-        ]
+        members = await search_member_names(current)
         return [
             app_commands.Choice(name=member, value=member)
-            for member in members if current.lower() in member.lower()
+            for member in members
         ]
     except Exception as e:
         print(f"Error in member_autocomplete: {e}")
@@ -66,7 +71,10 @@ async def boss_autocomplete(interaction: discord.Interaction, current: str):
 class MemberCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.pending_updates = {}
+        # Raw reaction events seen vs. acted on (everything else is filtered from the payload)
+        self.reaction_stats = {"dropped": 0, "processed": 0}
+        # Background OCR checks (referenced so they aren't garbage collected mid-run)
+        self.ocr_tasks = set()
         logger.info("MemberCommands cog initialized")
 
     @app_commands.guilds(discord.Object(id=1140429772531449886))
@@ -109,20 +117,29 @@ class MemberCommands(commands.Cog):
             embed.set_footer(text=f"Submitted by {interaction.user.display_name}")
 
             message = await verification_channel.send(embed=embed)
-            await message.add_reaction("✅")
-            await message.add_reaction("❌")
+            await message.add_reaction(APPROVE_EMOJI)
+            await message.add_reaction(REJECT_EMOJI)
 
             # Store pending update
             guild_name = await find_guild_by_member(member)
-            self.pending_updates[message.id] = {
+            await self.bot.pending.add(message.id, {
                 'type': 'damage',
                 'guild': guild_name,
                 'member': member,
                 'field': 'damages',
-                'value': (boss, parsed_damage)
-            }
+                'value': (boss, parsed_damage),
+                'channel_id': verification_channel.id
+            })
 
             logger.info(f"Damage submission created with message ID: {message.id}")
+
+            # Cross-check the screenshot in the background; the reply doesn't wait for OCR
+            if get_setting("ocr", "auto_check", True):
+                task = asyncio.create_task(
+                    self.check_submission(message, embed, attachment, boss, damage, parsed_damage)
+                )
+                self.ocr_tasks.add(task)
+                task.add_done_callback(self.ocr_tasks.discard)
             await interaction.response.send_message(
                 "Damage update submitted for verification!", ephemeral=True
             )
@@ -133,60 +150,125 @@ class MemberCommands(commands.Cog):
                 f"An error occurred: {e}", ephemeral=True
             )
 
+    async def approve_submission(self, message_id: int, update_info: dict, channel, message):
+        """Apply an approved submission, remove its verification message and post the change."""
+        # Claim the entry first: a reaction and OCR auto-approve can race for it
+        if await self.bot.pending.pop(message_id) is None:
+            return
+        try:
+            # Extract information
+            guild_name = update_info['guild']
+            member = update_info['member']
+            field = update_info['field']
+            value = update_info['value']  # Expected: (boss, damage)
+
+            await update_member_data(self.bot, guild_name, member, field, value)
+            logger.info(f"Update approved for {member} in {guild_name}")
+
+            # Delete the verification message
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+
+            # Format damage and show change
+            old_boss, old_damage = value
+            new_boss, new_damage = format_damage(value)
+
+            if old_boss != new_boss:
+                logger.warning("Boss name mismatch in format_damage output!")  # Debugging check
+
+            await channel.send(
+                f"Successfully updated damage for: {member}\n"
+                f"**{old_boss}**: `{old_damage}` → `{new_damage}`"
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing verification: {e}", exc_info=True)
+            await channel.send(
+                f"Error processing verification: {e}", delete_after=10
+            )
+
+    async def check_submission(self, message, embed: discord.Embed, attachment: discord.Attachment,
+                               boss: str, damage_input: str, damage: float):
+        """
+        OCR a submission's screenshot, annotate its embed and optionally
+        auto-approve a match. Damage matches at the precision it was typed
+        ("4.01b" accepts 4,005,000,000-4,015,000,000).
+        """
+        try:
+            image = await attachment.read()
+            stats = await self.bot.ocr.read_damage_stats(image)
+        except ImportError:
+            logger.warning("OCR check skipped: paddleocr is not installed")
+            return
+        except (OcrQueueFull, asyncio.TimeoutError) as e:
+            logger.warning(f"OCR check skipped for message {message.id}: {e or 'timed out'}")
+            return
+        except Exception as e:
+            logger.error(f"OCR check failed for message {message.id}: {e}", exc_info=True)
+            return
+
+        ocr_boss = OCR_BOSS_CODES.get(stats["boss"])
+        ocr_damage = stats["damage"]
+        match = ocr_boss == boss.lower() and damage_matches(damage_input, damage, ocr_damage)
+        update_info = self.bot.pending.get(message.id)
+        if update_info is None:
+            return  # already reviewed while OCR was running
+        await self.bot.pending.annotate(message.id, {
+            "ocr": {"boss": ocr_boss, "level": stats["level"], "damage": ocr_damage, "match": match}
+        })
+        logger.info(f"OCR for message {message.id}: {stats} (match={match})")
+
+        if match and get_setting("ocr", "auto_approve", False):
+            await self.approve_submission(message.id, update_info, message.channel, message)
+            return
+
+        embed.add_field(name="OCR Boss", value=ocr_boss or "not found", inline=True)
+        embed.add_field(
+            name="OCR Damage",
+            value=f"{ocr_damage / 1e9:.2f}B ({ocr_damage:,})" if ocr_damage else "not found",
+            inline=True
+        )
+        embed.add_field(name="Check", value="✅ Matches" if match else "⚠️ Mismatch", inline=True)
+        embed.color = discord.Color.green() if match else discord.Color.orange()
+        try:
+            await message.edit(embed=embed)
+        except discord.NotFound:
+            pass
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """Handle reactions to verification messages."""
-        if payload.user_id == self.bot.user.id:
+        # Filter on the raw payload only: no cache misses, no API calls
+        if (
+            payload.user_id == self.bot.user.id
+            or payload.emoji.name not in REVIEW_EMOJIS
+            or self.bot.cache.guild_by_channel(payload.channel_id) is None
+        ):
+            self.reaction_stats["dropped"] += 1
             return
 
         # Check if this message is pending verification
-        update_info = self.pending_updates.get(payload.message_id)
+        update_info = self.bot.pending.get(payload.message_id)
         if not update_info:
+            self.reaction_stats["dropped"] += 1
             return
+        self.reaction_stats["processed"] += 1
 
-        # Get the message
-        channel = self.bot.get_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
+        # Act on the message by id; it is only ever deleted, so no fetch is needed
+        channel = self.bot.get_partial_messageable(payload.channel_id)
+        message = channel.get_partial_message(payload.message_id)
 
         # Process the reaction
-        if str(payload.emoji) == "✅":
-            try:
-                # Extract information
-                guild_name = update_info['guild']
-                member = update_info['member']
-                field = update_info['field']
-                value = update_info['value']  # Expected: (boss, damage)
-
-                await update_member_data(self.bot, guild_name, member, field, value)
-                logger.info(f"Update approved for {member} in {guild_name}")
+        if payload.emoji.name == APPROVE_EMOJI:
+            await self.approve_submission(payload.message_id, update_info, channel, message)
 
-                # Delete the verification message
-                await message.delete()
-                # Remove from pending updates
-                del self.pending_updates[payload.message_id]
-
-                # Format damage and show change
-                old_boss, old_damage = value
-                new_boss, new_damage = format_damage(value)
-
-                if old_boss != new_boss:
-                    logger.warning("Boss name mismatch in format_damage output!")  # Debugging check
-
-                await channel.send(
-                    f"Successfully updated damage for: {member}\n"
-                    f"**{old_boss}**: `{old_damage}` → `{new_damage}`"
-                )
-
-            except Exception as e:
-                logger.error(f"Error processing verification: {e}", exc_info=True)
-                await channel.send(
-                    f"Error processing verification: {e}", delete_after=10
-                )
-
-        elif str(payload.emoji) == "❌":  # ✅ Move this outside the try-except block
+        elif payload.emoji.name == REJECT_EMOJI:
+            if await self.bot.pending.pop(payload.message_id) is None:
+                return
             try:
                 await message.delete()
-                del self.pending_updates[payload.message_id]
                 logger.info(f"Submission rejected for {update_info['member']}")
             except Exception as e:
                 logger.error(f"Error processing rejection: {e}", exc_info=True)
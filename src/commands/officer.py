@@ -2,15 +2,67 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 from typing import Optional
-from commands.member import boss_autocomplete
-from utils.data import add_member, edit_member, parse_damage_input, find_guild_by_member
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from commands.member import boss_autocomplete, format_damage
+from utils.data import (
+    add_member, edit_member, remove_member, parse_damage_input, find_guild_by_member,
+    search_member_names, search_guild_names, parse_member_rows, bulk_upsert_members,
+    apply_member_updates
+)
 
-# MongoDB connection setup
-MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+# Discord caps select menus at 25 options
+REVIEW_PAGE_SIZE = 25
+
+def describe_submission(entry: dict) -> str:
+    boss, damage = format_damage(entry["value"])
+    check = ""
+    if entry.get("ocr"):
+        check = " ✅" if entry["ocr"]["match"] else " ⚠️"
+    return f"{entry['member']} - {boss.upper()} {damage}{check}"
+
+class ReviewView(discord.ui.View):
+    """Multi-select list of a guild's pending submissions with approve/reject buttons."""
+
+    def __init__(self, cog, guild_name: str, submissions: list):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.guild_name = guild_name
+        self.submissions = dict(submissions)
+        self.selected = []
+
+        self.picker = discord.ui.Select(
+            placeholder="Select submissions",
+            min_values=1,
+            max_values=len(submissions),
+            options=[
+                discord.SelectOption(label=describe_submission(entry)[:100], value=str(message_id))
+                for message_id, entry in submissions
+            ]
+        )
+        self.picker.callback = self.on_select
+        self.add_item(self.picker)
+
+    async def on_select(self, interaction: discord.Interaction):
+        self.selected = [int(value) for value in self.picker.values]
+        await interaction.response.defer()
+
+    async def finish(self, interaction: discord.Interaction, approve: bool):
+        if not self.selected:
+            await interaction.response.send_message("Select at least one submission first.", ephemeral=True)
+            return
+        await interaction.response.defer()
+        self.stop()
+        summary = await self.cog.resolve_submissions(
+            interaction, self.guild_name, {message_id: self.submissions[message_id] for message_id in self.selected}, approve
+        )
+        await interaction.edit_original_response(content=summary, view=None)
+
+    @discord.ui.button(label="Approve selected", style=discord.ButtonStyle.success)
+    async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.finish(interaction, approve=True)
+
+    @discord.ui.button(label="Reject selected", style=discord.ButtonStyle.danger)
+    async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.finish(interaction, approve=False)
 
 class OfficerCommands(commands.Cog):
     """Officer commands for managing members."""
@@ -47,21 +99,18 @@ class OfficerCommands(commands.Cog):
 
     async def guild_autocomplete(self, interaction: discord.Interaction, current: str):
         """Autocomplete guild names."""
-        guilds = await db.guilds.find().to_list(None)
+        guilds = await search_guild_names(current)
         return [
-            app_commands.Choice(name=guild["_id"], value=guild["_id"])
-            for guild in guilds if current.lower() in guild["_id"].lower()
+            app_commands.Choice(name=guild, value=guild)
+            for guild in guilds
         ]
 
     async def member_autocomplete(self, interaction: discord.Interaction, current: str):
         """Autocomplete member names."""
-        guilds = await db.guilds.find().to_list(None)
-        members = [
-            member for guild in guilds for member in guild.get("members", {}).keys()
-        ]
+        members = await search_member_names(current)
         return [
             app_commands.Choice(name=member, value=member)
-            for member in members if current.lower() in member.lower()
+            for member in members
         ]
 
     # Define a top-level group (no guild decorator here):
@@ -139,6 +188,120 @@ class OfficerCommands(commands.Cog):
             await interaction.followup.send(f"Error: {str(e)}", ephemeral=True)
 
 
+    @member_group.command(name="bulk")
+    @app_commands.autocomplete(guild=guild_autocomplete)
+    async def member_bulk(
+        self,
+        interaction: discord.Interaction,
+        guild: str,
+        attachment: discord.Attachment
+    ):
+        """Add or update many members from a CSV/JSON sheet (name, rvd, aod, la)."""
+        print(f"[DEBUG] Command '/member bulk' called by {interaction.user.display_name} (ID: {interaction.user.id}).")
+
+        if not self.is_officer(interaction):
+            await interaction.response.send_message(
+                "You don't have permission to use this command.", 
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(thinking=True)
+
+        try:
+            content = await attachment.read()
+            rows, errors = parse_member_rows(content, attachment.filename, guild)
+            summary = await bulk_upsert_members(self.bot, rows)
+            errors = sorted(errors + summary["errors"])
+
+            lines = [
+                f"Bulk import for {guild}: {summary['inserted']} added, "
+                f"{summary['updated']} updated, {len(errors)} error(s)."
+            ]
+            for line, message in errors:
+                lines.append(f"Row {line}: {message}")
+            report = "\n".join(lines)
+            if len(report) > 1900:
+                report = report[:1900] + "\n…"
+            await interaction.followup.send(report)
+        except (ValueError, UnicodeDecodeError) as e:
+            await interaction.followup.send(f"Error: {str(e)}", ephemeral=True)
+
+    @member_group.command(name="review")
+    @app_commands.autocomplete(guild=guild_autocomplete)
+    async def member_review(self, interaction: discord.Interaction, guild: str):
+        """Approve or reject a guild's pending damage submissions in one go."""
+        print(f"[DEBUG] Command '/member review' called by {interaction.user.display_name} (ID: {interaction.user.id}).")
+
+        if not self.is_officer(interaction):
+            await interaction.response.send_message(
+                "You don't have permission to use this command.",
+                ephemeral=True
+            )
+            return
+
+        submissions = self.bot.pending.for_guild(guild, REVIEW_PAGE_SIZE)
+        if not submissions:
+            await interaction.response.send_message(f"No pending submissions for {guild}.", ephemeral=True)
+            return
+
+        total = len(self.bot.pending.for_guild(guild))
+        lines = [f"{index}. {describe_submission(entry)}" for index, (_, entry) in enumerate(submissions, start=1)]
+        if total > len(submissions):
+            lines.append(f"…and {total - len(submissions)} more (oldest shown first)")
+        await interaction.response.send_message(
+            f"**Pending submissions for {guild}**\n" + "\n".join(lines),
+            view=ReviewView(self, guild, submissions),
+            ephemeral=True
+        )
+
+    async def resolve_submissions(self, interaction: discord.Interaction, guild: str, submissions: dict, approve: bool) -> str:
+        """Apply or discard submissions with one bulk write, one bulk delete and one summary post."""
+        # Skip anything reviewed by reaction (or expired) since the picker was built
+        submissions = {
+            message_id: entry for message_id, entry in submissions.items()
+            if self.bot.pending.get(message_id) is not None
+        }
+        if not submissions:
+            return "These submissions were already reviewed."
+        try:
+            if approve:
+                result = await apply_member_updates(
+                    self.bot, guild,
+                    [(entry["member"], entry["field"], entry["value"]) for entry in submissions.values()]
+                )
+            await self.bot.pending.pop_many(list(submissions))
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        guild_doc = self.bot.cache.get_guild(guild) or {}
+        channel = interaction.guild.get_channel(int(guild_doc.get("channels", {}).get("verification", 0)))
+        if channel:
+            messages = [channel.get_partial_message(message_id) for message_id in submissions]
+            try:
+                # One request for up to 100 messages younger than 14 days
+                await channel.delete_messages(messages)
+            except discord.HTTPException:
+                for message in messages:
+                    try:
+                        await message.delete()
+                    except discord.HTTPException:
+                        pass
+
+        if approve:
+            lines = [f"Approved {len(submissions)} submission(s) for {guild} (by {interaction.user.display_name}):"]
+            lines += [f"• {describe_submission(entry)}" for entry in submissions.values()]
+            if result["missing"]:
+                lines.append(f"Not found: {', '.join(result['missing'])}")
+        else:
+            lines = [f"Rejected {len(submissions)} submission(s) for {guild} (by {interaction.user.display_name})."]
+        summary = "\n".join(lines)
+        if len(summary) > 1900:
+            summary = summary[:1900] + "\n…"
+        if channel:
+            await channel.send(summary)
+        return summary
+
     @member_group.command(name="delete")
     @app_commands.autocomplete(member_name=member_autocomplete, guild_name=guild_autocomplete)
     async def delete_member(
@@ -158,21 +321,8 @@ class OfficerCommands(commands.Cog):
             return
 
         try:
-            guild_data = await db.guilds.find_one({"_id": guild_name})
-            if not guild_data:
-                raise ValueError(f"Guild {guild_name} does not exist")
-
-            members = guild_data.get("members", {})
-            if member_name not in members:
-                raise ValueError(
-                    f"Member {member_name} not found in guild {guild_name}"
-                )
-
             # Remove the member
-            await db.guilds.update_one(
-                {"_id": guild_name},
-                {"$unset": {f"members.{member_name}": ""}}
-            )
+            await remove_member(guild_name, member_name)
 
             await interaction.response.send_message(
                 f"Successfully removed member: {member_name} from guild: {guild_name}"
@@ -1,17 +1,12 @@
 import discord
 from discord.ext import commands
 import os
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-
-# Load MongoDB URL and Discord Token
-MONGO_URL = os.getenv("MONGO_URL")
-DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
-print(f"DISCORD_TOKEN (first 5 chars): {DISCORD_TOKEN[:5] if DISCORD_TOKEN else 'Not Found'}")
-
-# MongoDB connection setup
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+from utils.database import get_db, close_client, pool_stats
+from utils.data import ensure_indexes, migrate_embedded_members, backfill_totals
+from utils.cache import guild_cache
+from utils.pending import pending_verifications
+from utils.config import get_setting
+from utils.ocr_pool import OcrService
 
 # Discord bot intents setup
 intents = discord.Intents.default()
@@ -24,33 +19,63 @@ intents.guilds = True
 class Bot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="!", intents=intents)
+        # One shared MongoDB client/pool for every cog and util
+        self.db = get_db()
+        # Bot-wide guild/member cache, kept current by utils.data
+        self.cache = guild_cache
+        # Submissions awaiting officer review, persisted across restarts
+        self.pending = pending_verifications
+        # OCR runs in worker processes so inference never stalls the gateway
+        self.ocr = OcrService()
 
     async def setup_hook(self):
+        await test_mongo(self.db)
+        await prepare_database()
+        await self.cache.load(self.db)
+        await self.pending.load(self.db)
+        if get_setting("cache", "change_streams", False):
+            self.cache.start_watching(self.db)
+        if get_setting("ocr", "preload", False):
+            await preload_ocr(self.ocr)
         await load_extensions(self)
 
-bot = Bot()
+    async def close(self):
+        self.cache.stop_watching()
+        self.ocr.shutdown()
+        await super().close()
+        close_client()
 
 # Replace with your numeric Guild ID
 guild_id = 1140429772531449886
 # Wrap the integer in a discord.Object for guild-specific sync
 guild_obj = discord.Object(id=guild_id)
 
-@bot.event
-async def on_ready():
-    try:
-        synced = await bot.tree.sync(guild=guild_obj)
-        print(f"Cleared and synced {len(synced)} command(s).")
-        for command in bot.tree.get_commands():
-            print(f"Registered command: {command.name}")
-    except Exception as e:
-        print(f"Failed to clear and sync commands: {e}")
+def create_bot() -> Bot:
+    """
+    Build the bot and register its events. Kept out of module scope because
+    OCR worker processes (spawn) re-import this module as __mp_main__ and
+    must not construct a Bot or a MongoDB client of their own.
+    """
+    bot = Bot()
+
+    @bot.event
+    async def on_ready():
+        try:
+            synced = await bot.tree.sync(guild=guild_obj)
+            print(f"Cleared and synced {len(synced)} command(s).")
+            for command in bot.tree.get_commands():
+                print(f"Registered command: {command.name}")
+        except Exception as e:
+            print(f"Failed to clear and sync commands: {e}")
+
+    @bot.command()
+    async def list_commands(ctx):
+        """List all registered slash commands."""
+        commands_ = await bot.tree.fetch_commands()
+        for cmd in commands_:
+            await ctx.send(f"Command: {cmd.name}, Description: {cmd.description}")
 
-@bot.command()
-async def list_commands(ctx):
-    """List all registered slash commands."""
-    commands_ = await bot.tree.fetch_commands()
-    for cmd in commands_:
-        await ctx.send(f"Command: {cmd.name}, Description: {cmd.description}")
+    return bot
 
 async def load_extensions(bot):
     extensions = ["commands.admin", "commands.member", "commands.officer", "commands.leaderboard"]
@@ -62,18 +87,45 @@ async def load_extensions(bot):
             print(f"Error loading extension {ext}: {e}")
     print(f"Current commands: {bot.tree.get_commands()}")
 
-async def test_mongo():
+async def test_mongo(db):
     try:
         await db.command("ping")
-        print("MongoDB connection successful!")
+        print(f"MongoDB connection successful! Pool: {pool_stats()}")
     except Exception as e:
         print(f"MongoDB connection failed: {e}")
 
-asyncio.run(test_mongo())
+async def preload_ocr(ocr):
+    """Start the OCR workers and load their models before the first submission."""
+    try:
+        load_times = await ocr.warm()
+        print(f"OCR workers ready: {len(load_times)} (model load {max(load_times):.2f}s)")
+    except ImportError:
+        print("OCR preload skipped: paddleocr is not installed")
+    except Exception as e:
+        print(f"OCR preload failed: {e}")
 
-if __name__ == "__main__":
+async def prepare_database():
+    try:
+        await ensure_indexes()
+        migrated = await migrate_embedded_members()
+        if migrated:
+            print(f"Migrated {migrated} member(s) into the members collection")
+        backfilled = await backfill_totals()
+        if backfilled:
+            print(f"Stored totals for {backfilled} member(s)")
+    except Exception as e:
+        print(f"Database preparation failed: {e}")
+
+def main():
+    # Load Discord Token (MONGO_URL is read by utils.database)
+    DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+    print(f"DISCORD_TOKEN (first 5 chars): {DISCORD_TOKEN[:5] if DISCORD_TOKEN else 'Not Found'}")
     try:
         print("Discord.py version:", discord.__version__)
+        bot = create_bot()
         bot.run(DISCORD_TOKEN)
     except Exception as e:
         print(f"Bot encountered an error during runtime: {e}")
+
+if __name__ == "__main__":
+    main()
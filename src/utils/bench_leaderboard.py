@@ -0,0 +1,49 @@
+from box import Timer
+timer = Timer()
+from box import handler, markup
+import argparse
+import json
+import statistics
+import time
+
+def bench(name, create_damage_board, guild_name, guild_data, runs):
+    """Time `runs` renders; the first (cold) run is reported separately."""
+    timings = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        png_bytes = create_damage_board(guild_name, guild_data)
+        timings.append(time.perf_counter() - start)
+    size = len(png_bytes)
+
+    cold, warm = timings[0], timings[1:]
+    print(markup(
+        f"[bold]{name:<7}[/] cold {cold * 1000:8.1f}ms | "
+        f"warm min {min(warm) * 1000:8.1f}ms  median {statistics.median(warm) * 1000:8.1f}ms  "
+        f"mean {statistics.mean(warm) * 1000:8.1f}ms | {size / 1024:.0f}KB"
+    ))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the leaderboard renderers")
+    parser.add_argument('--guild', default="StarCookiez")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--renderer', choices=["chrome", "pillow"], action='append',
+                        help="Renderer to benchmark (default: both)")
+    args = parser.parse_args()
+
+    with open('data/guilds.json', 'r') as f:
+        guild_data = json.load(f)[args.guild]
+
+    for name in args.renderer or ["chrome", "pillow"]:
+        if name == "chrome":
+            from leaderboard_chrome import create_damage_board, get_chrome_pool
+        else:
+            from leaderboard_pillow import create_damage_board
+        bench(name, create_damage_board, args.guild, guild_data, args.runs)
+        if name == "chrome":
+            get_chrome_pool().shutdown()
+
+if __name__ == "__main__":
+    with handler():
+        main()
+
+# run.vim: term python %
@@ -0,0 +1,78 @@
+from box import Timer
+timer = Timer()
+from box import handler, markup
+import argparse
+import glob
+import os
+import time
+from ocr_engine import get_ocr_engine
+from parse_damage_image import read_damage_stats, read_damage_stats_batch
+
+def expected_boss(path):
+    """Boss code from a file name like 'kim aod 1.jpg', or None"""
+    parts = os.path.basename(path).split()
+    return parts[1] if len(parts) >= 3 else None
+
+def boss_code(name):
+    """'Red Velvet Dragon' -> 'rvd'"""
+    return "".join(word[0] for word in name.split()).lower() if name else None
+
+def report(name, paths, elapsed, results, reference=None):
+    parsed = sum(stats["boss"] is not None and stats["damage"] is not None for stats in results)
+    boss_ok = sum(boss_code(stats["boss"]) == expected_boss(path) for path, stats in zip(paths, results))
+    line = (
+        f"[bold]{name:<12}[/] {len(paths)} images in {elapsed:6.2f}s | "
+        f"{len(paths) / elapsed:5.2f} images/s | parsed {parsed}/{len(paths)} | boss ok {boss_ok}/{len(paths)}"
+    )
+    if reference:
+        same = sum(a["damage"] == b["damage"] for a, b in zip(reference, results))
+        line += f" | damage = full frame {same}/{len(paths)}"
+    print(markup(line))
+    methods = {}
+    for stats in results:
+        methods[stats.get("roi")] = methods.get(stats.get("roi"), 0) + 1
+    print(f"{'':<14}roi: {methods}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-frame, ROI and batched OCR of damage screenshots")
+    parser.add_argument('--images', default='assets/guild_dmgs/*')
+    parser.add_argument('--batch-size', type=int, action='append',
+                        help="Images per batch (repeatable, default: 2 4 8)")
+    parser.add_argument('--rec-batch-num', type=int, default=6,
+                        help="Text crops per recognizer forward pass")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.images))
+    # Read files up front so the comparison is OCR only
+    images = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            images.append(f.read())
+
+    engine = get_ocr_engine(rec_batch_num=args.rec_batch_num)
+    engine.load()
+    print(f"Model load: {engine.load_time:.2f}s")
+    read_damage_stats(images[0])  # warm-up
+
+    # Full frame is the accuracy reference for every other mode
+    start = time.perf_counter()
+    full = [read_damage_stats(image, use_roi=False) for image in images]
+    report("full frame", paths, time.perf_counter() - start, full)
+
+    start = time.perf_counter()
+    sequential = [read_damage_stats(image) for image in images]
+    report("roi", paths, time.perf_counter() - start, sequential, full)
+
+    for batch_size in args.batch_size or [2, 4, 8]:
+        start = time.perf_counter()
+        batched = read_damage_stats_batch(images, batch_size)
+        report(f"roi batch {batch_size}", paths, time.perf_counter() - start, batched, full)
+        differing = [path for path, a, b in zip(paths, full, batched) if (a["boss"], a["damage"]) != (b["boss"], b["damage"])]
+        for path in differing:
+            print(markup(f"  [yellow]differs from full frame:[/] {path}"))
+
+if __name__ == "__main__":
+    with handler():
+        main()
+
+# run.vim: term python %
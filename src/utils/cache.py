@@ -0,0 +1,206 @@
+import asyncio
+import copy
+import logging
+
+from utils.rankings import GlobalLeaderboard
+from utils.search_index import NameIndex
+
+logger = logging.getLogger(__name__)
+
+class GuildCache:
+    """
+    In-process copy of the guilds and members collections.
+
+    Loaded once at startup, then kept current write-through by the mutators
+    in utils.data and, optionally, by MongoDB change streams. Reads never
+    touch the database.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.guilds = {}             # guild name -> guild document (no members)
+        self.members = {}            # member name -> member document
+        self.guild_members = {}      # guild name -> set of member names
+        self.verification_channels = {}  # verification channel id (str) -> guild name
+        self._member_ids = {}        # member document _id -> member name
+        self.member_index = NameIndex()
+        self.guild_index = NameIndex()
+        self.rankings = GlobalLeaderboard()
+        self._watch_tasks = []
+
+    # ------------------------------------------------------------------ loading
+
+    async def load(self, db):
+        """Replace the cache contents with the current database state."""
+        guilds = {}
+        async for guild in db.guilds.find():
+            guilds[guild["_id"]] = guild
+        members = [member async for member in db.members.find()]
+
+        self.guilds = {}
+        self.members = {}
+        self.guild_members = {}
+        self.verification_channels = {}
+        self._member_ids = {}
+        self.member_index = NameIndex()
+        self.guild_index = NameIndex()
+        self.rankings = GlobalLeaderboard()
+        for guild in guilds.values():
+            self.upsert_guild(guild)
+        for member in members:
+            self.upsert_member(member)
+        self.loaded = True
+        logger.info(f"Guild cache loaded: {len(self.guilds)} guilds, {len(self.members)} members")
+
+    # ------------------------------------------------------------------ reads
+
+    def guild_names(self) -> list:
+        return list(self.guilds)
+
+    def member_names(self) -> list:
+        return list(self.members)
+
+    def search_members(self, query: str, limit: int = 25) -> list:
+        return self.member_index.search(query, limit)
+
+    def search_guilds(self, query: str, limit: int = 25) -> list:
+        return self.guild_index.search(query, limit)
+
+    def guild_of(self, member: str):
+        record = self.members.get(member)
+        return record["guild"] if record else None
+
+    def guild_by_channel(self, channel_id) -> str:
+        return self.verification_channels.get(str(channel_id))
+
+    def get_guild(self, guild_name: str):
+        return self.guilds.get(guild_name)
+
+    def global_top(self, board: str = "total", n: int = 25) -> list:
+        """Top members across all guilds as (rank, name, guild, score)."""
+        return self.rankings.top(board, n)
+
+    def guild_data(self, guild_name: str):
+        """A copy of the guild document with its members attached, as the leaderboard expects."""
+        guild = self.guilds.get(guild_name)
+        if guild is None:
+            return None
+        guild = copy.deepcopy(guild)
+        guild["members"] = {
+            name: {
+                "damages": dict(self.members[name]["damages"]),
+                "last_donation": self.members[name].get("last_donation")
+            }
+            for name in self.guild_members.get(guild_name, ())
+        }
+        return guild
+
+    # ------------------------------------------------------------------ writes
+
+    def upsert_guild(self, guild: dict):
+        name = guild["_id"]
+        old = self.guilds.get(name)
+        if old:
+            self.verification_channels.pop(str(old.get("channels", {}).get("verification")), None)
+        guild = {key: value for key, value in guild.items() if key != "members"}
+        self.guilds[name] = guild
+        self.guild_members.setdefault(name, set())
+        self.guild_index.add(name)
+        verification = guild.get("channels", {}).get("verification")
+        if verification:
+            self.verification_channels[str(verification)] = name
+
+    def set_guild_field(self, guild_name: str, path: str, value):
+        """Apply a dotted-path $set (e.g. "channels.verification") to a cached guild."""
+        guild = self.guilds.get(guild_name)
+        if guild is None:
+            return
+        guild = copy.deepcopy(guild)
+        *parents, leaf = path.split(".")
+        target = guild
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+        self.upsert_guild(guild)
+
+    def remove_guild(self, guild_name: str):
+        guild = self.guilds.pop(guild_name, None)
+        if guild:
+            self.verification_channels.pop(str(guild.get("channels", {}).get("verification")), None)
+        self.guild_index.remove(guild_name)
+        for name in self.guild_members.pop(guild_name, set()):
+            self.members.pop(name, None)
+            self.member_index.remove(name)
+            self.rankings.remove_member(name)
+
+    def upsert_member(self, member: dict):
+        name = member["name"]
+        old = self.members.get(name)
+        if old and old["guild"] != member["guild"]:
+            self.guild_members.get(old["guild"], set()).discard(name)
+        record = {
+            "guild": member["guild"],
+            "name": name,
+            "damages": dict(member.get("damages", {})),
+            "last_donation": member.get("last_donation")
+        }
+        for key, value in member.items():
+            if key not in record and key != "_id":
+                record[key] = value
+        self.members[name] = record
+        self.guild_members.setdefault(member["guild"], set()).add(name)
+        self.member_index.add(name)
+        self.rankings.update_member(name, record["guild"], record["damages"])
+        if "_id" in member:
+            self._member_ids[member["_id"]] = name
+
+    def remove_member(self, name: str):
+        record = self.members.pop(name, None)
+        if record:
+            self.guild_members.get(record["guild"], set()).discard(name)
+        self.member_index.remove(name)
+        self.rankings.remove_member(name)
+        for member_id, member_name in list(self._member_ids.items()):
+            if member_name == name:
+                del self._member_ids[member_id]
+
+    # ------------------------------------------------------------------ change streams
+
+    def start_watching(self, db):
+        """Follow guild/member changes made by other processes (requires a replica set)."""
+        self._watch_tasks = [
+            asyncio.create_task(self._watch(db.guilds, self._apply_guild_change)),
+            asyncio.create_task(self._watch(db.members, self._apply_member_change))
+        ]
+
+    def stop_watching(self):
+        for task in self._watch_tasks:
+            task.cancel()
+        self._watch_tasks = []
+
+    async def _watch(self, collection, apply):
+        try:
+            async with collection.watch(full_document="updateLookup") as stream:
+                async for change in stream:
+                    apply(change)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Change stream on {collection.name} stopped: {e}")
+
+    def _apply_guild_change(self, change: dict):
+        if change["operationType"] == "delete":
+            self.remove_guild(change["documentKey"]["_id"])
+        elif change.get("fullDocument"):
+            self.upsert_guild(change["fullDocument"])
+
+    def _apply_member_change(self, change: dict):
+        if change["operationType"] == "delete":
+            name = self._member_ids.pop(change["documentKey"]["_id"], None)
+            if name:
+                self.remove_member(name)
+        elif change.get("fullDocument"):
+            self.upsert_member(change["fullDocument"])
+
+# Bot-wide instance, also exposed as bot.cache
+guild_cache = GuildCache()
@@ -0,0 +1,21 @@
+import json
+import os
+
+CONFIG_PATH = "config/config.json"
+
+_config = None
+
+def load_config() -> dict:
+    """Load config/config.json once and return the parsed settings."""
+    global _config
+    if _config is None:
+        if os.path.exists(CONFIG_PATH):
+            with open(CONFIG_PATH, 'r') as f:
+                _config = json.load(f)
+        else:
+            _config = {}
+    return _config
+
+def get_setting(section: str, key: str, default=None):
+    """Return config[section][key], or default if either is missing."""
+    return load_config().get(section, {}).get(key, default)
@@ -0,0 +1,35 @@
+# Suffixes accepted by parse_damage_input
+UNITS = {"b": 1e9, "m": 1e6}
+
+def parse_damage_input(damage_str):
+    """
+    Parses damage input string and returns the value in raw numbers (float).
+    Accepts inputs in formats like "8.88b", "8880M", or raw numbers.
+    """
+    try:
+        if isinstance(damage_str, (int, float)):
+            damage_str = str(damage_str)
+        damage_str = damage_str.lower().strip()
+        if damage_str.endswith(('b', 'm')):
+            multiplier = 1e9 if damage_str.endswith('b') else 1e6
+            return float(damage_str[:-1]) * multiplier
+        return float(damage_str)
+    except ValueError:
+        raise ValueError("Invalid damage input format")
+
+def damage_tolerance(damage_str) -> float:
+    """
+    Half a unit of the last digit the member typed, in raw damage:
+    "4.01b" -> 5,000,000, "8880M" -> 500,000, "4012345678" -> 0.5.
+    """
+    text = str(damage_str).lower().strip()
+    multiplier = UNITS.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in UNITS else text
+    decimals = len(number.split(".", 1)[1]) if "." in number else 0
+    return 0.5 * multiplier * 10 ** -decimals
+
+def damage_matches(damage_str, typed: float, read) -> bool:
+    """Whether the damage read off a screenshot agrees with the typed value at the precision it was typed."""
+    if read is None:
+        return False
+    return abs(read - typed) <= damage_tolerance(damage_str)
@@ -1,13 +1,19 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 from typing import Optional
+import copy
 import logging
+import time
+from pymongo import ASCENDING, DESCENDING, UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from utils.database import LazyDatabase
+from utils.cache import guild_cache
+from utils.search_index import NameIndex
+from utils.damage_check import parse_damage_input
+from utils.member_sheet import BOSSES, parse_member_rows
 
 logger = logging.getLogger(__name__)
 
-MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["discord_bot"]
+# Shared client owned by utils.database (the same one the bot exposes as bot.db)
+db = LazyDatabase()
 
 GUILD_TEMPLATE = {
     "channels": {
@@ -15,10 +21,11 @@ GUILD_TEMPLATE = {
         "leaderboard": None,
         "verification": None
     },
-    "role_id": None,
-    "members": {}
+    "role_id": None
 }
 
+# Members live in their own collection, one document per member:
+# {"guild": <guild _id>, "name": <member>, "damages": {...}, "last_donation": ...}
 MEMBER_TEMPLATE = {
     "damages": {
         "rvd": 0,
@@ -28,25 +35,181 @@ MEMBER_TEMPLATE = {
     "last_donation": None
 }
 
-def parse_damage_input(damage_str):
+MEMBER_PROJECTION = {"_id": 0, "name": 1, "damages": 1, "last_donation": 1}
+# What the cache/leaderboard need back from a member write
+UPDATED_MEMBER_PROJECTION = {"_id": 1, "guild": 1, "name": 1, "damages": 1, "last_donation": 1, "total": 1}
+LEADERBOARD_PROJECTION = {"_id": 0, "name": 1, "damages": 1, "total": 1}
+LEADERBOARD_SIZE = 30
+
+# Stored on every member as `total` so leaderboards can be read pre-sorted from an index
+TOTAL_EXPRESSION = {"$add": [f"$damages.{boss}" for boss in ["rvd", "aod", "la"]]}
+
+# Per-operation write latency: {op: {"count", "total", "max", "last"}} in seconds
+write_stats = {}
+
+def record_write_latency(op: str, start: float):
+    """Record and log how long a write path took since `start` (perf_counter)."""
+    elapsed = time.perf_counter() - start
+    stats = write_stats.setdefault(op, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+    stats["count"] += 1
+    stats["total"] += elapsed
+    stats["max"] = max(stats["max"], elapsed)
+    stats["last"] = elapsed
+    logger.info(f"{op} took {elapsed * 1000:.1f}ms")
+
+async def update_member_fields(guild_name: str, name: str, fields: dict) -> Optional[dict]:
     """
-    Parses damage input string and returns the value in raw numbers (float).
-    Accepts inputs in formats like "8.88b", "8880M", or raw numbers.
+    Apply a $set to one member and return the post-update document in the
+    same round-trip (None if the member does not exist).
     """
+    # Pipeline update so `total` is recomputed from the new damages atomically
+    pipeline = [
+        {"$set": {field: {"$literal": value} for field, value in fields.items()}},
+        {"$set": {"total": TOTAL_EXPRESSION}}
+    ]
+    member = await db.members.find_one_and_update(
+        {"guild": guild_name, "name": name},
+        pipeline,
+        projection=UPDATED_MEMBER_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if member:
+        guild_cache.upsert_member(member)
+    return member
+
+async def backfill_totals():
+    """Store `total` on members written before it was maintained."""
+    result = await db.members.update_many({"total": {"$exists": False}}, [{"$set": {"total": TOTAL_EXPRESSION}}])
+    return result.modified_count
+
+async def get_leaderboard_rows(guild_name: Optional[str] = None, limit: int = LEADERBOARD_SIZE) -> list:
+    """
+    Top `limit` members by stored total, already sorted by the (guild, total)
+    index, so a row's rank is its position. With no guild, ranks across every
+    guild using the total index.
+    """
+    query = {"guild": guild_name} if guild_name else {}
+    cursor = db.members.find(query, LEADERBOARD_PROJECTION).sort("total", DESCENDING).limit(limit)
+    return await cursor.to_list(limit)
+
+async def load_leaderboard_data(guild_name: str, limit: int = LEADERBOARD_SIZE) -> Optional[dict]:
+    """A guild document whose "members" are its top rows in rank order."""
+    guild = await get_guild(guild_name)
+    if guild is None:
+        return None
+    guild = {key: value for key, value in guild.items() if key != "members"}
+    guild["members"] = {row.pop("name"): row for row in await get_leaderboard_rows(guild_name, limit)}
+    guild["ranked"] = True
+    return guild
+
+async def ensure_indexes():
+    """Create the indexes the member lookups rely on (no-op if they exist)."""
+    await db.members.create_index([("guild", ASCENDING), ("name", ASCENDING)], unique=True)
+    await ensure_unique_names()
+    await db.members.create_index([("guild", ASCENDING), ("total", DESCENDING)])
+    await db.members.create_index([("total", DESCENDING)])
+    for boss in BOSSES:
+        await db.members.create_index([("guild", ASCENDING), (f"damages.{boss}", DESCENDING)])
+
+async def ensure_unique_names():
+    """
+    Member names are global (the cache, rankings and /member commands look
+    members up by name alone), so enforce that with a unique index on `name`.
+    """
+    index = await db.members.index_information()
+    if "name_1" in index and not index["name_1"].get("unique"):
+        # The non-unique index from earlier versions; replace it
+        await db.members.drop_index("name_1")
     try:
-        if isinstance(damage_str, (int, float)):
-            damage_str = str(damage_str)
-        damage_str = damage_str.lower().strip()
-        if damage_str.endswith(('b', 'm')):
-            multiplier = 1e9 if damage_str.endswith('b') else 1e6
-            return float(damage_str[:-1]) * multiplier
-        return float(damage_str)
-    except ValueError:
-        raise ValueError("Invalid damage input format")
+        await db.members.create_index([("name", ASCENDING)], unique=True)
+    except DuplicateKeyError:
+        # Keep lookups indexed; the duplicates have to be resolved by hand
+        duplicates = await db.members.aggregate([
+            {"$group": {"_id": "$name", "guilds": {"$push": "$guild"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}}
+        ]).to_list(None)
+        logger.error(f"Member names in more than one guild: {[(d['_id'], d['guilds']) for d in duplicates]}")
+        await db.members.create_index([("name", ASCENDING)])
+
+async def migrate_embedded_members():
+    """
+    Move members from the legacy `guilds.<name>.members` map into the members
+    collection. Idempotent: guilds without an embedded map are skipped.
+    """
+    migrated = 0
+    async for guild in db.guilds.find({"members": {"$exists": True}}):
+        operations = [
+            UpdateOne(
+                {"guild": guild["_id"], "name": name},
+                {"$set": {
+                    "damages": member.get("damages", copy.deepcopy(MEMBER_TEMPLATE["damages"])),
+                    "last_donation": member.get("last_donation")
+                }},
+                upsert=True
+            )
+            for name, member in guild["members"].items()
+        ]
+        if operations:
+            try:
+                await db.members.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # A name already used by another guild; keep the embedded copy so nothing is lost
+                names = list(guild["members"])
+                conflicts = [names[error["index"]] for error in e.details["writeErrors"]]
+                logger.error(f"Not migrating {guild['_id']}: {conflicts} already belong to another guild")
+                continue
+        await db.guilds.update_one({"_id": guild["_id"]}, {"$unset": {"members": ""}})
+        migrated += len(operations)
+        logger.info(f"Migrated {len(operations)} members of {guild['_id']} to the members collection")
+    return migrated
+
+async def get_guild(guild_name: str) -> Optional[dict]:
+    """A guild document (without members), served from the cache once loaded."""
+    if guild_cache.loaded:
+        return guild_cache.get_guild(guild_name)
+    return await db.guilds.find_one({"_id": guild_name})
+
+async def load_all_guild_data() -> dict:
+    """Every guild document, keyed by name, with members attached."""
+    if guild_cache.loaded:
+        return {name: guild_cache.guild_data(name) for name in guild_cache.guild_names()}
+    guilds = {}
+    async for guild in db.guilds.find():
+        guild["members"] = {}
+        guilds[guild["_id"]] = guild
+    async for member in db.members.find({}, {**MEMBER_PROJECTION, "guild": 1}):
+        guild = guilds.get(member.pop("guild"))
+        if guild is not None:
+            guild["members"][member.pop("name")] = member
+    return guilds
+
+async def list_guild_names() -> list:
+    """Names of every guild."""
+    if guild_cache.loaded:
+        return guild_cache.guild_names()
+    return [guild["_id"] async for guild in db.guilds.find({}, {"_id": 1})]
+
+async def list_member_names() -> list:
+    """Names of every member in every guild."""
+    if guild_cache.loaded:
+        return guild_cache.member_names()
+    return [member["name"] async for member in db.members.find({}, {"_id": 0, "name": 1})]
+
+async def search_member_names(query: str, limit: int = 25) -> list:
+    """Best-matching member names for autocomplete (Discord shows at most 25)."""
+    if guild_cache.loaded:
+        return guild_cache.search_members(query, limit)
+    return NameIndex(await list_member_names()).search(query, limit)
+
+async def search_guild_names(query: str, limit: int = 25) -> list:
+    """Best-matching guild names for autocomplete."""
+    if guild_cache.loaded:
+        return guild_cache.search_guilds(query, limit)
+    return NameIndex(await list_guild_names()).search(query, limit)
 
 async def create_guild(name: str, announce_id: str, leaderboard_id: str, verif_id: str, role_id: str):
     """Create a new guild using the template."""
-    new_guild = GUILD_TEMPLATE.copy()
+    new_guild = copy.deepcopy(GUILD_TEMPLATE)
     new_guild["channels"]["announcements"] = announce_id
     new_guild["channels"]["leaderboard"] = leaderboard_id
     new_guild["channels"]["verification"] = verif_id
@@ -58,6 +221,7 @@ async def create_guild(name: str, announce_id: str, leaderboard_id: str, verif_i
 
     new_guild["_id"] = name
     await db.guilds.insert_one(new_guild)
+    guild_cache.upsert_guild(new_guild)
 
 async def edit_guild(name: str, param: str, new_value: str):
     """Edit an existing guild."""
@@ -71,50 +235,127 @@ async def edit_guild(name: str, param: str, new_value: str):
     result = await db.guilds.update_one({"_id": name}, {"$set": {update_field: new_value}})
     if result.matched_count == 0:
         raise ValueError(f"Guild {name} not found")
+    guild_cache.set_guild_field(name, update_field, new_value)
 
 async def add_member(name: str, guild: str, rvd: Optional[int] = 0, aod: Optional[int] = 0, la: Optional[int] = 0):
     """Add a new member to a guild."""
-    new_member = MEMBER_TEMPLATE.copy()
+    new_member = copy.deepcopy(MEMBER_TEMPLATE)
     new_member["damages"]["rvd"] = rvd
     new_member["damages"]["aod"] = aod
     new_member["damages"]["la"] = la
+    new_member["guild"] = guild
+    new_member["name"] = name
+    new_member["total"] = sum(new_member["damages"].values())
 
-    result = await db.guilds.update_one(
-        {"_id": guild, f"members.{name}": {"$exists": False}},
-        {"$set": {f"members.{name}": new_member}}
-    )
-    if result.matched_count == 0:
+    if not await get_guild(guild):
         raise ValueError(f"Guild {guild} not found or member {name} already exists")
+    current_guild = await find_guild_by_member(name)
+    if current_guild:
+        raise ValueError(f"{name} already belongs to {current_guild}")
+    try:
+        await db.members.insert_one(new_member)
+    except DuplicateKeyError:
+        raise ValueError(f"Guild {guild} not found or member {name} already exists")
+    guild_cache.upsert_member(new_member)
+
+async def remove_member(guild: str, name: str):
+    """Delete a member from a guild."""
+    if not await get_guild(guild):
+        raise ValueError(f"Guild {guild} does not exist")
+
+    result = await db.members.delete_one({"guild": guild, "name": name})
+    if result.deleted_count == 0:
+        raise ValueError(f"Member {name} not found in guild {guild}")
+    guild_cache.remove_member(name)
+
+async def bulk_upsert_members(bot, rows: list) -> dict:
+    """
+    Apply parsed member rows with one unordered bulk write per guild, then
+    schedule a single leaderboard refresh per guild touched.
+
+    Returns {"inserted", "updated", "errors": [(line, message)]}.
+    """
+    start = time.perf_counter()
+    summary = {"inserted": 0, "updated": 0, "errors": []}
+
+    by_guild = {}
+    for row in rows:
+        if not await get_guild(row["guild"]):
+            summary["errors"].append((row["line"], f"Guild {row['guild']} not found"))
+            continue
+        current_guild = await find_guild_by_member(row["name"])
+        if current_guild and current_guild != row["guild"]:
+            summary["errors"].append((row["line"], f"{row['name']} already belongs to {current_guild}"))
+            continue
+        by_guild.setdefault(row["guild"], []).append(row)
+
+    for guild_name, guild_rows in by_guild.items():
+        operations = []
+        for row in guild_rows:
+            defaults = copy.deepcopy(MEMBER_TEMPLATE)
+            on_insert = {
+                f"damages.{boss}": defaults["damages"][boss]
+                for boss in BOSSES if f"damages.{boss}" not in row["fields"]
+            }
+            if "last_donation" not in row["fields"]:
+                on_insert["last_donation"] = defaults["last_donation"]
+            update = {"$setOnInsert": on_insert}
+            if row["fields"]:
+                update["$set"] = row["fields"]
+            operations.append(UpdateOne({"guild": guild_name, "name": row["name"]}, update, upsert=True))
+
+        try:
+            result = await db.members.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get("writeErrors", []):
+                row = guild_rows[error["index"]]
+                summary["errors"].append((row["line"], error.get("errmsg", "Write failed")))
+        summary["inserted"] += details.get("nUpserted", 0)
+        summary["updated"] += details.get("nMatched", 0)
+
+        # Recompute totals server-side, refresh the cache with one read, then the board once
+        names = [row["name"] for row in guild_rows]
+        await db.members.update_many(
+            {"guild": guild_name, "name": {"$in": names}},
+            [{"$set": {"total": TOTAL_EXPRESSION}}]
+        )
+        async for member in db.members.find({"guild": guild_name, "name": {"$in": names}}, UPDATED_MEMBER_PROJECTION):
+            guild_cache.upsert_member(member)
+        schedule_leaderboard_refresh(bot, guild_name)
+
+    record_write_latency("bulk_upsert_members", start)
+    return summary
+
+def schedule_leaderboard_refresh(bot, guild_name: str):
+    """Mark a guild's leaderboard dirty so the LeaderboardCog re-renders it."""
+    leaderboard_cog = bot.get_cog("LeaderboardCog")
+    if leaderboard_cog:
+        leaderboard_cog.schedule_refresh(guild_name)
+        logger.info(f"Leaderboard refresh scheduled for {guild_name}")
+    else:
+        logger.error("LeaderboardCog not found! Cannot update leaderboard.")
 
 async def edit_member(bot, guild_name: str, name: str, boss: str, new_damage: int):
     """Edit member data and trigger leaderboard update."""
-    
-    if boss in ["rvd", "aod", "la"]:
-        update_field = f"members.{name}.damages.{boss}"
+    start = time.perf_counter()
+
+    if boss in BOSSES:
+        update_field = f"damages.{boss}"
     elif boss == "last_donation":
-        update_field = f"members.{name}.last_donation"
+        update_field = "last_donation"
     else:
         raise ValueError(f"Invalid parameter: {boss}")
 
-    result = await db.guilds.update_one(
-        {f"members.{name}": {"$exists": True}},
-        {"$set": {update_field: new_damage}}
-    )
+    member = await update_member_fields(guild_name, name, {update_field: new_damage})
+    record_write_latency("edit_member", start)
 
-    if result.matched_count == 0:
+    if member is None:
         raise ValueError(f"Member {name} not found in any guild")
 
-    # 🔹 Fetch the updated guild data directly
-    guild_data = await db.guilds.find_one({"_id": guild_name})
-    if not guild_data:
-        raise ValueError(f"Guild {guild_name} not found in the database.")
-
-    # 🔹 Update the leaderboard
-    leaderboard_cog = bot.get_cog("LeaderboardCog")
-    if leaderboard_cog:
-        await leaderboard_cog.update_guild_leaderboard(guild_name, guild_data)
-    else:
-        logger.error("LeaderboardCog not found! Cannot update leaderboard.")
+    # 🔹 Queue a leaderboard refresh (coalesced with other recent edits)
+    schedule_leaderboard_refresh(bot, guild_name)
 
 async def submit_dmg(member: str, boss: str, damage: str, attachment: str):
     """Submit a damage update request."""
@@ -124,8 +365,8 @@ async def submit_dmg(member: str, boss: str, damage: str, attachment: str):
         if not guild_name:
             raise ValueError(f"Member {member} not found in any guild")
 
-        # Fetch guild data from the database
-        guild = await db.guilds.find_one({"_id": guild_name})
+        # Fetch guild data (cached)
+        guild = await get_guild(guild_name)
         if not guild or "channels" not in guild or "verification" not in guild["channels"]:
             raise ValueError(f"Verification channel not configured for guild {guild_name}")
 
@@ -152,7 +393,7 @@ async def submit_relics(member: str, attachment: str):
     if not guild_name:
         raise ValueError(f"Member {member} not found in any guild")
 
-    guild = await db.guilds.find_one({"_id": guild_name})
+    guild = await get_guild(guild_name)
     verification_channel_id = guild["channels"]["verification"]
 
     return {
@@ -163,42 +404,81 @@ async def submit_relics(member: str, attachment: str):
 
 async def find_guild_by_member(member: str) -> Optional[str]:
     """Find the guild a member belongs to."""
-    guild = await db.guilds.find_one({f"members.{member}": {"$exists": True}})
-    return guild["_id"] if guild else None
+    if guild_cache.loaded:
+        return guild_cache.guild_of(member)
+    record = await db.members.find_one({"name": member}, {"_id": 0, "guild": 1})
+    return record["guild"] if record else None
 
 async def find_guild_by_channel(channel_id: int) -> Optional[str]:
     """Find the guild associated with a verification channel."""
+    if guild_cache.loaded:
+        return guild_cache.guild_by_channel(channel_id)
     guild = await db.guilds.find_one({"channels.verification": str(channel_id)})
     return guild["_id"] if guild else None
 
+async def apply_member_updates(bot, guild_name: str, updates: list) -> dict:
+    """
+    Apply many approved (member, field, value) updates for one guild with a
+    single bulk write, then refresh the cache and the leaderboard once.
+
+    Returns {"updated": [names], "missing": [names]}.
+    """
+    start = time.perf_counter()
+    operations = []
+    names = []
+    for member, field, value in updates:
+        if field == "damages":
+            boss, damage = value
+            fields = {f"damages.{boss}": damage}
+        elif field == "last_donation":
+            fields = {"last_donation": value}
+        else:
+            raise ValueError(f"Invalid field: {field}")
+        operations.append(UpdateOne(
+            {"guild": guild_name, "name": member},
+            [
+                {"$set": {key: {"$literal": val} for key, val in fields.items()}},
+                {"$set": {"total": TOTAL_EXPRESSION}}
+            ]
+        ))
+        names.append(member)
+
+    if not operations:
+        return {"updated": [], "missing": []}
+
+    # Ordered, so two approvals for the same member/boss apply in submission order
+    await db.members.bulk_write(operations, ordered=True)
+    found = set()
+    async for member in db.members.find({"guild": guild_name, "name": {"$in": names}}, UPDATED_MEMBER_PROJECTION):
+        guild_cache.upsert_member(member)
+        found.add(member["name"])
+    record_write_latency("apply_member_updates", start)
+
+    schedule_leaderboard_refresh(bot, guild_name)
+    return {
+        "updated": [name for name in dict.fromkeys(names) if name in found],
+        "missing": [name for name in dict.fromkeys(names) if name not in found]
+    }
+
 async def update_member_data(bot, guild_name: str, member: str, field: str, value: any):
     """Update a member's data field after approval and refresh the leaderboard."""
-    
+    start = time.perf_counter()
+
     if field == "damages":
         boss, damage = value
-        update_field = f"members.{member}.damages.{boss}"
+        update_field = f"damages.{boss}"
     elif field == "last_donation":
-        update_field = f"members.{member}.last_donation"
+        update_field = "last_donation"
     else:
         raise ValueError(f"Invalid field: {field}")
 
-    result = await db.guilds.update_one(
-        {"_id": guild_name},
-        {"$set": {update_field: damage if field == "damages" else value}}
+    updated = await update_member_fields(
+        guild_name, member, {update_field: damage if field == "damages" else value}
     )
+    record_write_latency("update_member_data", start)
 
-    if result.matched_count == 0:
+    if updated is None:
         raise ValueError(f"Guild {guild_name} or member {member} not found")
 
-    # 🔹 Fetch updated guild data directly (Fix the issue!)
-    guild_data = await db.guilds.find_one({"_id": guild_name})
-    if not guild_data:
-        raise ValueError(f"Guild {guild_name} not found in the database.")
-
-    # 🔹 Get the LeaderboardCog and refresh the leaderboard
-    leaderboard_cog = bot.get_cog("LeaderboardCog")
-    if leaderboard_cog:
-        await leaderboard_cog.update_guild_leaderboard(guild_name, guild_data)  # ✅ Use `guild_data` instead of `guilds[guild_name]`
-        logger.info(f"Leaderboard refreshed for {guild_name}")
-    else:
-        logger.error("LeaderboardCog not found! Cannot update leaderboard.")
\ No newline at end of file
+    # 🔹 Queue a leaderboard refresh (coalesced with other recent approvals)
+    schedule_leaderboard_refresh(bot, guild_name)
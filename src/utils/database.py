@@ -0,0 +1,116 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+import logging
+import os
+import threading
+
+from utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+MONGO_URL = os.getenv("MONGO_URL")
+DB_NAME = "discord_bot"
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so pool usage can be reported."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            "pools": 0,
+            "open": 0,
+            "checked_out": 0,
+            "created": 0,
+            "closed": 0,
+            "checkout_failures": 0
+        }
+
+    def _bump(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
+    def pool_created(self, event):
+        self._bump(pools=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        self._bump(pools=-1)
+
+    def connection_created(self, event):
+        self._bump(created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(checked_out=-1)
+
+_client = None
+_pool_listener = PoolStatsListener()
+
+def get_client() -> AsyncIOMotorClient:
+    """The bot-wide MongoDB client, created on first use from the "database" config."""
+    global _client
+    if _client is None:
+        options = {
+            "maxPoolSize": get_setting("database", "max_pool_size", 20),
+            "minPoolSize": get_setting("database", "min_pool_size", 0),
+            "maxIdleTimeMS": get_setting("database", "max_idle_time_ms", 300000),
+            "serverSelectionTimeoutMS": get_setting("database", "server_selection_timeout_ms", 5000),
+            "connectTimeoutMS": get_setting("database", "connect_timeout_ms", 5000),
+            "socketTimeoutMS": get_setting("database", "socket_timeout_ms", 20000),
+            "event_listeners": [_pool_listener]
+        }
+        compressors = get_setting("database", "compressors", None)
+        if compressors:
+            options["compressors"] = compressors
+        _client = AsyncIOMotorClient(MONGO_URL, **options)
+        logger.info(f"MongoDB client created (maxPoolSize={options['maxPoolSize']}, compressors={compressors})")
+    return _client
+
+def get_db():
+    """The bot's database on the shared client."""
+    return get_client()[DB_NAME]
+
+class LazyDatabase:
+    """
+    Module-level stand-in for get_db(): the shared client is only created on
+    first use, so importing a util (e.g. in an OCR worker process) never
+    opens a connection pool.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+def pool_stats() -> dict:
+    """Connection pool counters plus the configured pool limits."""
+    stats = dict(_pool_listener.stats)
+    if _client is not None:
+        pool_options = _client.delegate.options.pool_options
+        stats["max_pool_size"] = pool_options.max_pool_size
+        stats["min_pool_size"] = pool_options.min_pool_size
+    return stats
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -8,67 +8,120 @@ import time
 import sys
 from box import markup
 import platform
+import json
+import base64
+import mimetypes
+import threading
+import queue
+import atexit
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException, TimeoutException
 
-def get_player_stats(guild_data):
-    def format_number(n):
-        if n >= 1_000_000_000:
-            return f"{n/1_000_000_000:.2f}B"
-        if n >= 1_000_000:
-            return f"{n/1_000_000:.2f}M"
-        if n >= 1_000:
-            return f"{n/1_000:.2f}K"
-        return str(n)
-
-    # Convert guild member data to sorted list of player stats
-    player_stats = []
-    for player, data in guild_data['members'].items():
-        damages = data['damages']
-        total_damage = damages['rvd'] + damages['aod'] + damages['la']
-        player_stats.append({
-            "name": player,
-            "rvd": format_number(damages['rvd']),
-            "aod": format_number(damages['aod']),
-            "la": format_number(damages['la']),
-            "total": format_number(total_damage),
-            "total_num": total_damage
-        })
-    
-    # Sort by total damage descending (need to convert back to number first)
-    player_stats.sort(key=lambda x: x["total_num"], reverse=True)
-    # delete total_num
-    for player in player_stats:
-        del player["total_num"]
-    
-    if len(player_stats) < 30:
-        remaining_players = 30 - len(player_stats)
-        player_stats += [{ "name": "Player {player_number}".format(player_number=remaining_players + i - 1), "rvd": 0, "aod": 0, "la": 0, "total": 0 } for i in range(30 - len(player_stats))]
-    return player_stats
+try:
+    from utils.config import get_setting
+except ImportError:  # run as a script from src/utils
+    from config import get_setting
+try:
+    from utils.leaderboard_common import BACKGROUND_PATH, FONT_DIR, get_player_stats
+except ImportError:  # run as a script from src/utils
+    from leaderboard_common import BACKGROUND_PATH, FONT_DIR, get_player_stats
 
-def create_damage_board(guild_name, guild_data):
-    player_stats = get_player_stats(guild_data)
+FONTS = [
+    {"family": "Inter", "file": "Inter.ttf", "weight": "100 900"},
+    {"family": "Vollkorn", "file": "Vollkorn.ttf", "weight": "400 900"},
+]
 
-    # Setup Jinja environment
-    env = Environment(loader=FileSystemLoader('assets'))
-    template = env.get_template('template.html')
+_data_uris = {}
 
-    # Render template
-    html_content = template.render(
-        guild_name=guild_name,
-        players=player_stats
-    )
+def get_data_uri(path: str) -> str:
+    """base64 data: URI for an asset, re-encoded only when the file changes."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _data_uris.get(path)
+    if cached is None or cached[0] != mtime:
+        mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if path.endswith('.ttf'):
+            mime_type = 'font/ttf'
+        with open(path, 'rb') as f:
+            encoded = base64.b64encode(f.read()).decode('ascii')
+        cached = (mtime, f"data:{mime_type};base64,{encoded}")
+        _data_uris[path] = cached
+    return cached[1]
 
-    # Save rendered template
-    html_path = f"leaderboard_{guild_name}.html"
-    with open(html_path, 'w') as file:
-        file.write(html_content)
+def get_font_faces():
+    """@font-face entries (inlined as data URIs) for the bundled fonts on disk."""
+    faces = []
+    for font in FONTS:
+        path = os.path.join(FONT_DIR, font["file"])
+        if os.path.exists(path):
+            faces.append({"family": font["family"], "src": get_data_uri(path), "weight": font["weight"]})
+        else:
+            print(f"Font {path} missing, falling back to system fonts (run src/utils/setup_fonts.py)")
+    return faces
 
-    # Chrome setup
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--start-maximized')
-    chrome_options.add_argument('--force-device-scale-factor=2.0')  # Increase resolution
+def load_html(driver, html_content: str):
+    """Replace the current page with in-memory HTML via CDP; nothing touches disk."""
+    if not driver.current_url.startswith('about:blank'):
+        driver.get('about:blank')
+    frame_id = driver.execute_cdp_cmd('Page.getFrameTree', {})['frameTree']['frame']['id']
+    driver.execute_cdp_cmd('Page.setDocumentContent', {'frameId': frame_id, 'html': html_content})
 
+def wait_for_assets(driver, timeout: float) -> str:
+    """
+    Block until the page has loaded, its fonts are ready and its CSS
+    background images are decoded, or `timeout` seconds pass.
+    Page.setDocumentContent returns before any of that happens.
+    """
+    driver.set_script_timeout(timeout)
+    script = '''
+        const done = arguments[arguments.length - 1];
+        const loaded = document.readyState === 'complete'
+            ? Promise.resolve()
+            : new Promise(resolve => window.addEventListener('load', resolve, {once: true}));
+        const backgrounds = [...document.querySelectorAll('*')]
+            .map(element => getComputedStyle(element).backgroundImage)
+            .filter(value => value.startsWith('url('))
+            .map(value => {
+                const image = new Image();
+                image.src = value.slice(4, -1).replace(/^["']|["']$/g, '');
+                return image.decode().catch(() => null);
+            });
+        Promise.all([loaded, document.fonts.ready, ...backgrounds])
+            .then(() => done(document.fonts.status));
+    '''
+    try:
+        return driver.execute_async_script(script)
+    except TimeoutException:
+        print(f"Page assets not ready after {timeout}s, rendering anyway")
+        return 'timeout'
+
+_jinja_env = None
+_templates = {}
+
+def get_jinja_env():
+    """Shared Jinja environment; templates auto-reload only in developer mode."""
+    global _jinja_env
+    if _jinja_env is None:
+        _jinja_env = Environment(
+            loader=FileSystemLoader('assets'),
+            auto_reload=get_setting("bot_settings", "developer_mode", False)
+        )
+    return _jinja_env
+
+def get_template(name: str = 'template.html'):
+    """Compiled template lookup; in developer mode Jinja re-checks the file's mtime."""
+    if get_setting("bot_settings", "developer_mode", False):
+        return get_jinja_env().get_template(name)
+    template = _templates.get(name)
+    if template is None:
+        template = _templates[name] = get_jinja_env().get_template(name)
+    return template
+
+def precompile_templates(names=('template.html',)):
+    """Compile templates up front so the first render doesn't pay for parsing."""
+    for name in names:
+        get_template(name)
+
+def get_chrome_paths():
     if platform.system() == 'Windows':
         path_to_chromedriver = "bin/chromedriver.exe"
         path_to_chrome = "bin/chrome-headless-shell-win64/chrome-headless-shell.exe"
@@ -90,39 +143,178 @@ def create_damage_board(guild_name, guild_data):
     if any(not os.access(path, os.X_OK) for path in [path_to_chromedriver, path_to_chrome]):
         sys.exit(1)
 
+    return path_to_chromedriver, path_to_chrome
+
+def launch_driver():
+    """Start a new chromedriver + chrome-headless-shell session."""
+    path_to_chromedriver, path_to_chrome = get_chrome_paths()
+
+    # Chrome setup
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--start-maximized')
+    chrome_options.add_argument('--force-device-scale-factor=2.0')  # Increase resolution
+
     chrome_options.binary_location = path_to_chrome
     service = webdriver.ChromeService(path_to_chromedriver)
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    return webdriver.Chrome(service=service, options=chrome_options)
 
-    # driver.set_window_size(3000,800)
-    # driver.execute_script("document.body.style.zoom='250%'")
+class ChromePool:
+    """
+    A fixed-size pool of warm headless Chrome sessions.
 
-    driver.get(f'file://{os.path.abspath(html_path)}')
-    driver.maximize_window()
+    Drivers are launched lazily up to `size`, health-checked before each
+    use and recycled once they have served `max_renders` renders.
+    """
 
-    # wait for the page to load
-    while True:
-        script = '''return document.fonts.status;'''
-        loaded = driver.execute_script(script)
-        if loaded == 'loaded':
-            print('All fonts loaded')
-            break
-        print('Fonts still loading')
-        time.sleep(.5)
+    def __init__(self, size: int = 2, max_renders: int = 100):
+        self.size = max(1, size)
+        self.max_renders = max_renders
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        self.stats = {"launched": 0, "recycled": 0, "unhealthy": 0, "renders": 0}
 
-    screenshot_path = f"leaderboard_{guild_name}.png"
+    def _launch(self):
+        driver = launch_driver()
+        self.stats["launched"] += 1
+        return {"driver": driver, "renders": 0}
 
-    selector = "body"
-    element = driver.find_element(By.CSS_SELECTOR, selector)
-    # element.screenshot(screenshot_path)
+    def _discard(self, entry):
+        with self._lock:
+            self._live -= 1
+        try:
+            entry["driver"].quit()
+        except Exception as e:
+            print(f"Error closing Chrome session: {e}")
 
-    driver.set_window_size(element.size['width'], element.size['height'])
-    driver.save_screenshot(screenshot_path)
-    
-    # Clean up
-    driver.quit()
-    
-    return screenshot_path, html_path
+    def _is_healthy(self, entry) -> bool:
+        try:
+            return entry["driver"].execute_script("return 1;") == 1
+        except WebDriverException:
+            return False
+
+    def acquire(self):
+        """Borrow a healthy driver, launching one if the pool is not yet full."""
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_launch = self._live < self.size
+                    if can_launch:
+                        self._live += 1
+                if can_launch:
+                    try:
+                        return self._launch()
+                    except Exception:
+                        with self._lock:
+                            self._live -= 1
+                        raise
+                try:
+                    # Re-check periodically in case a busy driver was discarded
+                    entry = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+            if self._is_healthy(entry):
+                return entry
+            self.stats["unhealthy"] += 1
+            self._discard(entry)
+
+    def release(self, entry, healthy: bool = True):
+        """Return a driver to the pool, recycling it if spent or broken."""
+        entry["renders"] += 1
+        self.stats["renders"] += 1
+        if self._closed or not healthy or entry["renders"] >= self.max_renders:
+            if healthy and not self._closed:
+                self.stats["recycled"] += 1
+            self._discard(entry)
+            return
+        self._idle.put(entry)
+
+    @contextmanager
+    def session(self):
+        entry = self.acquire()
+        healthy = True
+        try:
+            yield entry["driver"]
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.release(entry, healthy)
+
+    def shutdown(self):
+        """Quit every idle driver; busy ones are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(entry)
+
+_chrome_pool = None
+_chrome_pool_lock = threading.Lock()
+
+def get_chrome_pool() -> ChromePool:
+    """Return the process-wide Chrome pool, creating it on first use."""
+    global _chrome_pool
+    with _chrome_pool_lock:
+        if _chrome_pool is None:
+            _chrome_pool = ChromePool(
+                size=get_setting("leaderboard", "chrome_pool_size", 2),
+                max_renders=get_setting("leaderboard", "chrome_max_renders", 100)
+            )
+            atexit.register(_chrome_pool.shutdown)
+        return _chrome_pool
+
+def create_damage_board(guild_name, guild_data):
+    timings = {}
+    start = time.perf_counter()
+    player_stats = get_player_stats(guild_data)
+
+    template = get_template('template.html')
+
+    # Render template
+    html_content = template.render(
+        guild_name=guild_name,
+        players=player_stats,
+        fonts=get_font_faces(),
+        background=get_data_uri(BACKGROUND_PATH)
+    )
+    timings["template"] = time.perf_counter() - start
+
+    # Borrow a warm browser from the pool instead of launching a new one
+    start = time.perf_counter()
+    with get_chrome_pool().session() as driver:
+        timings["acquire"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_html(driver, html_content)
+        driver.maximize_window()
+        timings["load"] = time.perf_counter() - start
+
+        # wait for the load event, fonts and background (event-driven, bounded)
+        start = time.perf_counter()
+        wait_for_assets(driver, get_setting("leaderboard", "font_timeout_seconds", 5))
+        timings["assets"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        selector = "body"
+        element = driver.find_element(By.CSS_SELECTOR, selector)
+
+        driver.set_window_size(element.size['width'], element.size['height'])
+        png_bytes = driver.get_screenshot_as_png()
+        timings["screenshot"] = time.perf_counter() - start
+
+    breakdown = ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in timings.items())
+    print(f"Rendered {guild_name} leaderboard: {breakdown}")
+
+    return png_bytes
 
 # Test
 if __name__ == "__main__":
@@ -131,6 +323,8 @@ if __name__ == "__main__":
     with open('data/guilds.json', 'r') as f:
         guilds_data = json.load(f)
     
-    screenshot_path, html_path = create_damage_board("StarCookiez", guilds_data["StarCookiez"])
+    png_bytes = create_damage_board("StarCookiez", guilds_data["StarCookiez"])
+    screenshot_path = "leaderboard_StarCookiez.png"
+    with open(screenshot_path, 'wb') as f:
+        f.write(png_bytes)
     print(f"Screenshot saved as: {screenshot_path}")
-    print(f"HTML file saved as: {html_path}")
@@ -0,0 +1,74 @@
+import glob
+import hashlib
+import json
+import os
+
+# Shared by both renderers and the leaderboard cog; keep this free of Selenium and Pillow
+TEMPLATE_PATH = 'assets/template.html'
+FONT_DIR = 'assets/fonts'
+BACKGROUND_PATH = 'assets/starcookiez-bg-image-blurred.png'
+
+def get_player_stats(guild_data):
+    def format_number(n):
+        if n >= 1_000_000_000:
+            return f"{n/1_000_000_000:.2f}B"
+        if n >= 1_000_000:
+            return f"{n/1_000_000:.2f}M"
+        if n >= 1_000:
+            return f"{n/1_000:.2f}K"
+        return str(n)
+
+    # Convert guild member data to sorted list of player stats
+    player_stats = []
+    for player, data in guild_data['members'].items():
+        damages = data['damages']
+        total_damage = data.get('total', damages['rvd'] + damages['aod'] + damages['la'])
+        player_stats.append({
+            "name": player,
+            "rvd": format_number(damages['rvd']),
+            "aod": format_number(damages['aod']),
+            "la": format_number(damages['la']),
+            "total": format_number(total_damage),
+            "total_num": total_damage
+        })
+    
+    # Sort by total damage descending, unless the rows came pre-ranked from the
+    # (guild, total) index (see utils.data.load_leaderboard_data)
+    if not guild_data.get('ranked'):
+        player_stats.sort(key=lambda x: x["total_num"], reverse=True)
+    # delete total_num
+    for player in player_stats:
+        del player["total_num"]
+    
+    if len(player_stats) < 30:
+        remaining_players = 30 - len(player_stats)
+        player_stats += [{ "name": "Player {player_number}".format(player_number=remaining_players + i - 1), "rvd": 0, "aod": 0, "la": 0, "total": 0 } for i in range(30 - len(player_stats))]
+    return player_stats
+
+_file_versions = {}
+
+def get_file_version(path: str):
+    """Hash of one asset file, recomputed only when it changes (None if missing)."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _file_versions.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = _file_versions[path] = (mtime, hashlib.sha256(f.read()).hexdigest())
+    return cached[1]
+
+def get_asset_version() -> str:
+    """Combined hash of the template, background and bundled fonts a board is drawn from."""
+    paths = [TEMPLATE_PATH, BACKGROUND_PATH] + sorted(glob.glob(os.path.join(FONT_DIR, '*.ttf')))
+    payload = json.dumps([[path, get_file_version(path)] for path in paths])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def board_cache_key(renderer, guild_name, player_stats) -> str:
+    """Content address of a rendered board: renderer + asset version + guild + rows."""
+    payload = json.dumps(
+        [renderer, get_asset_version(), guild_name, player_stats],
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,174 @@
+from PIL import Image, ImageDraw, ImageEnhance, ImageFont
+import io
+import os
+
+try:
+    from utils.leaderboard_common import BACKGROUND_PATH, FONT_DIR, get_player_stats
+except ImportError:  # run as a script from src/utils
+    from leaderboard_common import BACKGROUND_PATH, FONT_DIR, get_player_stats
+
+# Pure-Pillow version of assets/template.html. Sizes are CSS pixels and are
+# multiplied by SCALE to match Chrome's --force-device-scale-factor=2.0.
+SCALE = 2
+BODY_COLOR = (15, 23, 42)       # --slate-900
+BORDER_COLOR = (51, 65, 85)     # --slate-700
+TEXT_COLOR = (255, 255, 255)
+CONTAINER_PADDING = 8
+CELL_PADDING_X = 12
+CELL_PADDING_Y = 6
+TITLE_PADDING_Y = 8
+HEADERS = ["#", "Player", "RVD", "AOD", "LA", "Total"]
+
+# (file in assets/fonts, weight, system fallback) per text style
+FONT_FILES = {
+    "title": ("Vollkorn.ttf", 600, "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf"),
+    "header": ("Inter.ttf", 600, "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    "cell": ("Inter.ttf", 400, "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"),
+}
+FONT_SIZES = {"title": 24, "header": 14, "cell": 16, "rank": 14.4}
+
+_fonts = {}
+_background = None
+
+def get_font(style: str, size: float):
+    """Load (and cache) the font for a text style, preferring bundled assets."""
+    key = (style, size)
+    if key not in _fonts:
+        bundled, weight, fallback = FONT_FILES[style]
+        pixel_size = round(size * SCALE)
+        bundled_path = os.path.join(FONT_DIR, bundled)
+        if os.path.exists(bundled_path):
+            font = ImageFont.truetype(bundled_path, pixel_size)
+            set_weight(font, weight)
+        elif os.path.exists(fallback):
+            font = ImageFont.truetype(fallback, pixel_size)
+        else:
+            font = ImageFont.load_default(pixel_size)
+        _fonts[key] = font
+    return _fonts[key]
+
+def set_weight(font, weight: int):
+    """Pin the wght axis of a variable font, leaving other axes at their defaults."""
+    try:
+        axes = font.get_variation_axes()
+    except (OSError, NotImplementedError):  # static font or no FreeType MM support
+        return
+    values = []
+    for axis in axes:
+        name = axis["name"].decode() if isinstance(axis["name"], bytes) else axis["name"]
+        value = weight if name == "Weight" else axis["default"]
+        values.append(min(max(value, axis["minimum"]), axis["maximum"]))
+    font.set_variation_by_axes(values)
+
+def get_background():
+    """The dimmed background image, loaded once."""
+    global _background
+    if _background is None:
+        image = Image.open(BACKGROUND_PATH).convert('RGB')
+        _background = ImageEnhance.Brightness(image).enhance(0.5)
+    return _background
+
+def cover(image, width: int, height: int, position_x: float = 0.9):
+    """CSS background-size: cover with background-position-x / y: 0."""
+    ratio = max(width / image.width, height / image.height)
+    # Crop in source pixels first so only the visible region is resampled
+    source_w = min(image.width, width / ratio)
+    source_h = min(image.height, height / ratio)
+    left = (image.width - source_w) * position_x
+    return image.resize((width, height), box=(left, 0, left + source_w, source_h))
+
+def text_width(draw, text: str, font, letter_spacing: float = 0) -> float:
+    return draw.textlength(text, font=font) + letter_spacing * len(text)
+
+def draw_text(draw, x: float, y: float, text: str, font, letter_spacing: float = 0):
+    if not letter_spacing:
+        draw.text((x, y), text, font=font, fill=TEXT_COLOR)
+        return
+    for char in text:
+        draw.text((x, y), char, font=font, fill=TEXT_COLOR)
+        x += draw.textlength(char, font=font) + letter_spacing
+
+def create_damage_board(guild_name, guild_data):
+    """Render the 30-row damage board straight to PNG bytes, without a browser."""
+    player_stats = get_player_stats(guild_data)
+
+    title_font = get_font("title", FONT_SIZES["title"])
+    header_font = get_font("header", FONT_SIZES["header"])
+    cell_font = get_font("cell", FONT_SIZES["cell"])
+    rank_font = get_font("cell", FONT_SIZES["rank"])
+    header_spacing = 0.1 * FONT_SIZES["header"] * SCALE
+
+    headers = [header.upper() for header in HEADERS]
+    rows = [
+        [str(index), str(player["name"]), str(player["rvd"]), str(player["aod"]), str(player["la"]), str(player["total"])]
+        for index, player in enumerate(player_stats, start=1)
+    ]
+
+    # Measure columns the way the auto-width table would
+    scratch = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    pad_x = CELL_PADDING_X * SCALE
+    pad_y = CELL_PADDING_Y * SCALE
+    column_widths = []
+    for col, header in enumerate(headers):
+        header_w = text_width(scratch, header, header_font, header_spacing)
+        row_font = rank_font if col == 0 else cell_font
+        cell_w = max(text_width(scratch, row[col], row_font) for row in rows)
+        column_widths.append(round(max(header_w, cell_w)) + 2 * pad_x + SCALE)
+
+    line_height = round(FONT_SIZES["cell"] * 1.2 * SCALE)
+    row_height = line_height + 2 * pad_y + SCALE
+    title_height = round(FONT_SIZES["title"] * 1.2 * SCALE) + 2 * TITLE_PADDING_Y * SCALE
+    table_width = sum(column_widths)
+    container = CONTAINER_PADDING * SCALE
+    width = table_width + 2 * container
+    height = container + title_height + row_height * (len(rows) + 1) + container
+
+    image = Image.new('RGB', (width, height), BODY_COLOR)
+    image.paste(cover(get_background(), width, height), (0, 0))
+    draw = ImageDraw.Draw(image)
+
+    # Title
+    title_w = text_width(draw, guild_name, title_font)
+    draw.text(((width - title_w) / 2, container + TITLE_PADDING_Y * SCALE), guild_name, font=title_font, fill=TEXT_COLOR)
+
+    # Header + rows
+    top = container + title_height
+    for row_index, row in enumerate([headers] + rows):
+        is_header = row_index == 0
+        y = top + row_index * row_height
+        x = container
+        for col, text in enumerate(row):
+            col_w = column_widths[col]
+            font = header_font if is_header else (rank_font if col == 0 else cell_font)
+            spacing = header_spacing if is_header else 0
+            w = text_width(draw, text, font, spacing)
+            if col == 0:
+                text_x = x + col_w - pad_x - SCALE - w
+            else:
+                text_x = x + (col_w - SCALE - w) / 2
+            text_y = y + pad_y + (line_height - font.size) / 2
+            draw_text(draw, text_x, text_y, text, font, spacing)
+
+            if col < len(row) - 1:
+                draw.rectangle((x + col_w - SCALE, y, x + col_w - 1, y + row_height - 1), fill=BORDER_COLOR)
+            x += col_w
+        if row_index < len(rows):
+            draw.rectangle((container, y + row_height - SCALE, container + table_width - 1, y + row_height - 1), fill=BORDER_COLOR)
+
+    # Favour encode speed over file size; zlib level 6 triples render time
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+# Test
+if __name__ == "__main__":
+    import json
+
+    with open('data/guilds.json', 'r') as f:
+        guilds_data = json.load(f)
+
+    png_bytes = create_damage_board("StarCookiez", guilds_data["StarCookiez"])
+    screenshot_path = "leaderboard_StarCookiez.png"
+    with open(screenshot_path, 'wb') as f:
+        f.write(png_bytes)
+    print(f"Screenshot saved as: {screenshot_path}")
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+try:
+    from utils.damage_check import parse_damage_input
+except ImportError:  # run as a script from src/utils
+    from damage_check import parse_damage_input
+
+BOSSES = ["rvd", "aod", "la"]
+
+def parse_member_rows(content: bytes, filename: str, default_guild: str):
+    """
+    Parse a CSV or JSON member sheet into (rows, errors).
+
+    CSV needs a header with `name` and any of rvd/aod/la/last_donation/guild.
+    JSON is a list of objects with the same keys (or {"members": [...]}).
+    Damages accept the same formats as parse_damage_input ("8.88b", ...).
+    Each row becomes {"line", "guild", "name", "fields"}; errors are
+    (line, message) tuples.
+    """
+    text = content.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            return [], [(0, f"Invalid JSON: {e}")]
+        if isinstance(records, dict):
+            records = records.get("members", [])
+        if not isinstance(records, list):
+            return [], [(0, "JSON must be a list of member objects")]
+        numbered = list(enumerate(records, start=1))
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        numbered = [(index, record) for index, record in enumerate(reader, start=2)]
+
+    rows, errors, seen = [], [], set()
+    for line, record in numbered:
+        if not isinstance(record, dict):
+            errors.append((line, "Row is not an object"))
+            continue
+        record = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+        name = str(record.get("name") or "").strip()
+        if not name:
+            errors.append((line, "Missing name"))
+            continue
+        guild = str(record.get("guild") or default_guild).strip()
+        if (guild, name) in seen:
+            errors.append((line, f"Duplicate row for {name}"))
+            continue
+
+        fields = {}
+        try:
+            for boss in BOSSES:
+                value = record.get(boss)
+                if value is not None and str(value).strip() != "":
+                    fields[f"damages.{boss}"] = int(parse_damage_input(value))
+        except (ValueError, TypeError, OverflowError, AttributeError):
+            # Also inf/1e400 (int overflow) and lists or objects in JSON
+            errors.append((line, f"Invalid damage value for {name}"))
+            continue
+        if "last_donation" in record and str(record["last_donation"] or "").strip():
+            fields["last_donation"] = str(record["last_donation"]).strip()
+
+        seen.add((guild, name))
+        rows.append({"line": line, "guild": guild, "name": name, "fields": fields})
+    return rows, errors
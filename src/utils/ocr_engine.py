@@ -0,0 +1,132 @@
+import copy
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class OcrEngine:
+    """
+    One PaddleOCR instance (detector, angle classifier and recognizer) shared
+    by every parser.
+
+    The models are loaded once, on first use or eagerly via `load()`, instead
+    of on every call. PaddleOCR predictors are not safe to call concurrently,
+    so inference is serialized behind a lock; callers in async code should run
+    `ocr()` in an executor.
+    """
+
+    def __init__(self, **options):
+        self.options = {"use_angle_cls": True, "lang": "en", "show_log": False, **options}
+        self._ocr = None
+        self._load_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+        self.load_time = None
+        self.inferences = 0
+        self.total_inference_time = 0.0
+        self.last_inference_time = None
+        self.batched_images = 0
+        self.total_batch_time = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._ocr is not None
+
+    def load(self):
+        """Download (first run) and load the models into memory. Safe to call repeatedly."""
+        if self._ocr is not None:
+            return self._ocr
+        with self._load_lock:
+            if self._ocr is None:
+                from paddleocr import PaddleOCR
+                start = time.perf_counter()
+                self._ocr = PaddleOCR(**self.options)
+                self.load_time = time.perf_counter() - start
+                logger.info(f"OCR models loaded in {self.load_time:.2f}s")
+        return self._ocr
+
+    def ocr(self, image, cls: bool = True):
+        """Run detection + recognition on a path, URL or ndarray; same output as PaddleOCR.ocr."""
+        engine = self.load()
+        with self._infer_lock:
+            start = time.perf_counter()
+            result = engine.ocr(image, cls=cls)
+            elapsed = time.perf_counter() - start
+        self.inferences += 1
+        self.total_inference_time += elapsed
+        self.last_inference_time = elapsed
+        return result
+
+    def ocr_batch(self, images: list, cls: bool = True, batch_size: int = 8) -> list:
+        """
+        OCR several images (paths, bytes or ndarrays); returns one PaddleOCR-style
+        page per image, None for an image without text.
+
+        Detection runs per image since every screenshot has its own size, but
+        the text crops of up to `batch_size` images go through the angle
+        classifier and recognizer together, in full rec_batch_num forward passes
+        instead of a few small ones per image.
+        """
+        engine = self.load()
+        from paddleocr.paddleocr import check_img
+        from ppocr.utils.utility import alpha_to_color
+        from tools.infer.predict_system import sorted_boxes
+        from tools.infer.utility import get_rotate_crop_image
+
+        pages = []
+        for offset in range(0, len(images), batch_size):
+            chunk = images[offset:offset + batch_size]
+            with self._infer_lock:
+                start = time.perf_counter()
+                boxes_per_image = []
+                crops = []
+                for image in chunk:
+                    image = alpha_to_color(check_img(image), (255, 255, 255))
+                    dt_boxes, _ = engine.text_detector(image.copy())
+                    dt_boxes = sorted_boxes(dt_boxes) if dt_boxes is not None and len(dt_boxes) else []
+                    boxes_per_image.append(dt_boxes)
+                    crops.extend(get_rotate_crop_image(image, copy.deepcopy(box)) for box in dt_boxes)
+                if crops and cls and engine.use_angle_cls:
+                    crops, _, _ = engine.text_classifier(crops)
+                rec_res = engine.text_recognizer(crops)[0] if crops else []
+                elapsed = time.perf_counter() - start
+
+            self.batched_images += len(chunk)
+            self.total_batch_time += elapsed
+            position = 0
+            for dt_boxes in boxes_per_image:
+                results = rec_res[position:position + len(dt_boxes)]
+                position += len(dt_boxes)
+                page = [
+                    [box.tolist(), result]
+                    for box, result in zip(dt_boxes, results) if result[1] >= engine.drop_score
+                ]
+                pages.append(page or None)
+        return pages
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "load_time": self.load_time,
+            "inferences": self.inferences,
+            "last_inference_time": self.last_inference_time,
+            "avg_inference_time": self.total_inference_time / self.inferences if self.inferences else 0.0,
+            "batched_images": self.batched_images,
+            "batch_images_per_sec": self.batched_images / self.total_batch_time if self.total_batch_time else 0.0
+        }
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_ocr_engine(**options) -> OcrEngine:
+    """
+    The process-wide OCR engine (models are not loaded until first use or
+    load()). `options` are PaddleOCR arguments and only apply to the call
+    that creates it.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OcrEngine(**options)
+    return _engine
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Native thread pools PaddleOCR's dependencies size from the environment
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+class OcrQueueFull(Exception):
+    """Raised when an OCR job cannot be admitted within the admission timeout."""
+
+# ---------------------------------------------------------------------- worker side
+
+_load_error = None
+
+def _init_worker(threads: int):
+    """Pin the worker's thread count and load the models before the first job arrives."""
+    global _load_error
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    from utils.ocr_engine import get_ocr_engine
+    try:
+        get_ocr_engine(cpu_threads=threads).load()
+    except Exception as e:  # keep the worker alive; jobs report the error
+        _load_error = e
+
+def _warm_job() -> float:
+    if _load_error:
+        raise _load_error
+    from utils.ocr_engine import get_ocr_engine
+    return get_ocr_engine().load_time
+
+def _read_damage_stats_job(image) -> dict:
+    if _load_error:
+        raise _load_error
+    from utils.ocr_engine import get_ocr_engine
+    from utils.parse_damage_image import read_damage_stats
+    engine = get_ocr_engine()
+    stats = read_damage_stats(image)
+    stats["inference_time"] = engine.last_inference_time
+    return stats
+
+def _read_damage_stats_batch_job(images: list, batch_size: int) -> list:
+    if _load_error:
+        raise _load_error
+    from utils.parse_damage_image import read_damage_stats_batch
+    return read_damage_stats_batch(images, batch_size)
+
+# ---------------------------------------------------------------------- bot side
+
+class OcrService:
+    """
+    Awaitable front end for OCR running in a pool of worker processes.
+
+    Each worker holds its own warm PaddleOCR instance and is pinned to
+    `threads` native threads, so inference never holds the bot's GIL and
+    throughput scales with `workers`. At most `workers + max_queue` jobs are
+    admitted at once; callers wait up to `admit_timeout` for a slot and then
+    get OcrQueueFull. A job that exceeds `timeout` (or whose caller is
+    cancelled) is abandoned: it is dropped if it has not started, and its
+    result discarded if it has, keeping its slot until the worker is free.
+    """
+
+    def __init__(self, workers: int = None, threads: int = None, max_queue: int = None,
+                 timeout: float = None, admit_timeout: float = None):
+        self.workers = workers or get_setting("ocr", "workers", 2)
+        self.threads = threads or get_setting("ocr", "threads_per_worker", 2)
+        self.max_queue = max_queue if max_queue is not None else get_setting("ocr", "queue_size", 8)
+        self.timeout = timeout or get_setting("ocr", "timeout_seconds", 60)
+        self.admit_timeout = admit_timeout or get_setting("ocr", "admit_timeout_seconds", 30)
+        self._executor = None
+        self._slots = None
+        self.waiting_for_slot = 0
+        self.admitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process with a running event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads,)
+            )
+            self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        executor = self._get_executor()
+        self.waiting_for_slot += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.admit_timeout)
+        except asyncio.TimeoutError:
+            self.waiting_for_slot -= 1
+            self.rejected += 1
+            raise OcrQueueFull(f"OCR queue full ({self.workers} workers, {self.max_queue} queued)")
+        except BaseException:
+            self.waiting_for_slot -= 1
+            raise
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = executor.submit(fn, *args)
+        # The slot follows the worker, not the caller, so abandoned jobs still count.
+        # Done callbacks run on the executor's thread, hence call_soon_threadsafe.
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        self.waiting_for_slot -= 1
+        self.admitted += 1
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timed_out += 1
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+        finally:
+            self.admitted -= 1
+            self.last_latency = time.perf_counter() - start
+            self.total_latency += self.last_latency
+
+    def _release_slot(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:  # loop already closed during shutdown
+            pass
+
+    async def read_damage_stats(self, image) -> dict:
+        """OCR a result screen (bytes or path) and return boss, level, damage and inference_time."""
+        return await self._submit(_read_damage_stats_job, image)
+
+    async def read_damage_stats_batch(self, images: list, batch_size: int = None) -> list:
+        """OCR several result screens as one job; one stats dict per image, in order."""
+        batch_size = batch_size or get_setting("ocr", "batch_size", 8)
+        return await self._submit(_read_damage_stats_batch_job, images, batch_size)
+
+    async def warm(self) -> list:
+        """Start every worker and wait for its models to load; returns per-worker load times."""
+        return await asyncio.gather(*(self._submit(_warm_job) for _ in range(self.workers)))
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed + self.timed_out + self.cancelled
+        return {
+            "workers": self.workers,
+            "threads_per_worker": self.threads,
+            # Admitted jobs may still sit in the pool's queue; workers don't report when they start
+            "waiting_for_slot": self.waiting_for_slot,
+            "admitted": self.admitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "last_latency": self.last_latency,
+            "avg_latency": self.total_latency / finished if finished else 0.0
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
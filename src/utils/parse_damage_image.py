@@ -2,7 +2,12 @@ from box import Timer
 
 timer = Timer()
 from box import handler, ic, ib, rel2abs, markup
-from paddleocr import PaddleOCR
+try:
+    from utils.ocr_engine import get_ocr_engine
+    from utils.roi import layout_box, first_pass_scale, union_box
+except ImportError:  # run as a script from src/utils
+    from ocr_engine import get_ocr_engine
+    from roi import layout_box, first_pass_scale, union_box
 import time
 import glob
 import re
@@ -62,6 +67,7 @@ def parse_damage_stats(lines):
     }
 
 def parse_image_verbose(image_path):
+    from paddleocr import PaddleOCR
     ocr = PaddleOCR(
         use_angle_cls=True, 
         lang='en',
@@ -75,23 +81,99 @@ def parse_image_verbose(image_path):
             print(line)
         print()
 
-def parse_image(image_path):
-    start_time = time.time()
-    ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False) # need to run only once to download and load model into memory
-    result = ocr.ocr(image_path, cls=True)
+def relevant_lines(result):
+    """Texts of the OCR lines that can hold the boss, level or damage"""
     lines = []
-    for idx in range(len(result)):
-        res = result[idx]
-        for line in res:
+    for res in result:
+        for line in res or []:  # PaddleOCR yields None for a page without text
             if not should_print_line(line[1][0]):
                 continue
             text, confidence = line[-1]
             lines.append(text)
-    print(lines)
-    stats = parse_damage_stats(lines)
+    return lines
+
+def load_image(image):
+    """Decode a path or raw bytes into the BGR ndarray PaddleOCR works on"""
+    import cv2
+    import numpy as np
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, (bytes, bytearray)):
+        return cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.imread(image)
+
+def crop(image, box):
+    import numpy as np
+    left, top, right, bottom = box
+    return np.ascontiguousarray(image[top:bottom, left:right])
+
+def locate_roi(image):
+    """
+    Box around the boss/level/damage lines and how it was found: "layout" for
+    a known screen layout, "first pass" for a low-resolution OCR pass, or
+    (None, "full frame") when neither finds it
+    """
+    height, width = image.shape[:2]
+    box = layout_box(width, height)
+    if box:
+        return box, "layout"
+
+    import cv2
+    scale = first_pass_scale(height)
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else image
+    result = get_ocr_engine().ocr(small, cls=False)
+    quads = [line[0] for page in result for line in page or [] if should_print_line(line[1][0])]
+    box = union_box(quads, scale, width, height)
+    return (box, "first pass") if box else (None, "full frame")
+
+def is_complete(stats):
+    return stats["boss"] is not None and stats["damage"] is not None
+
+def read_damage_stats(image, use_roi=True):
+    """
+    OCR a result screen (path, raw bytes or ndarray) and parse boss, level and damage.
+
+    With use_roi, full-resolution recognition only runs on the results band;
+    the whole frame is read only if the band yields no boss or damage.
+    """
+    engine = get_ocr_engine()
+    image = load_image(image)
+    if use_roi:
+        box, method = locate_roi(image)
+        if box:
+            stats = parse_damage_stats(relevant_lines(engine.ocr(crop(image, box), cls=True)))
+            if is_complete(stats):
+                return dict(stats, roi=method)
+    stats = parse_damage_stats(relevant_lines(engine.ocr(image, cls=True)))
+    return dict(stats, roi="full frame")
+
+def read_damage_stats_batch(images, batch_size=8, use_roi=True):
+    """
+    OCR several result screens in batches; one stats dict per image, in order.
+    Screens with a known layout are cropped to it; incomplete results are
+    retried one by one
+    """
+    images = [load_image(image) for image in images]
+    boxes = [layout_box(image.shape[1], image.shape[0]) if use_roi else None for image in images]
+    inputs = [crop(image, box) if box else image for image, box in zip(images, boxes)]
+    pages = get_ocr_engine().ocr_batch(inputs, cls=True, batch_size=batch_size)
+
+    results = []
+    for image, box, page in zip(images, boxes, pages):
+        stats = dict(parse_damage_stats(relevant_lines([page])), roi="layout" if box else "full frame")
+        if not is_complete(stats):
+            # Layout crops fall back to the full frame; other screens get the first pass
+            stats = read_damage_stats(image, use_roi=use_roi and box is None)
+        results.append(stats)
+    return results
+
+def parse_image(image_path, use_roi=True):
+    start_time = time.time()
+    engine = get_ocr_engine()  # models are loaded once, on the first call
+    stats = read_damage_stats(image_path, use_roi)
     print(stats)
     time_taken = time.time() - start_time
-    print(f"Time taken: {time_taken:.2f}s")
+    print(f"Time taken: {time_taken:.2f}s (roi: {stats['roi']}, last inference {engine.last_inference_time:.2f}s, model load {engine.load_time:.2f}s once)")
     return stats
 
 def main():
@@ -10,6 +10,10 @@ import os
 from pathlib import Path
 import numpy as np
 import cv2
+try:
+    from utils.ocr_engine import get_ocr_engine
+except ImportError:  # run as a script from src/utils
+    from ocr_engine import get_ocr_engine
 
 # Configuration
 CACHE_DIR = "cache/ocr_results"
@@ -207,11 +211,31 @@ def perform_ocr(image_path, use_cache=USE_CACHE):
     print("Cache disabled, running OCR")
     return _run_ocr(image_path)
 
+def perform_ocr_batch(image_paths, use_cache=USE_CACHE, batch_size=8):
+    """Perform OCR on several images, batching every image not already cached"""
+    results = [None] * len(image_paths)
+    hashes = [get_image_hash(path) for path in image_paths] if use_cache else [None] * len(image_paths)
+    if use_cache:
+        for index, image_hash in enumerate(hashes):
+            results[index] = load_from_cache(image_hash)
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    print(f"{len(image_paths) - len(missing)} cached, running OCR on {len(missing)}")
+    if missing:
+        start = time.time()
+        pages = get_ocr_engine().ocr_batch([image_paths[index] for index in missing], cls=True, batch_size=batch_size)
+        elapsed = time.time() - start
+        print(f"OCR: {len(missing) / elapsed:.2f} images/s")
+        for index, page in zip(missing, pages):
+            # Same shape as PaddleOCR.ocr on a single image: a list with one page
+            results[index] = [page]
+            if use_cache:
+                save_to_cache(hashes[index], results[index])
+    return results
+
 def _run_ocr(image_path):
-    """Internal function to run PaddleOCR"""
-    from paddleocr import PaddleOCR
-    ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
-    return ocr.ocr(image_path, cls=True)
+    """Internal function to run PaddleOCR on the shared, preloaded engine"""
+    return get_ocr_engine().ocr(image_path, cls=True)
 
 def parse_total_damage_image(image_path, use_cache=USE_CACHE):
     """Parse the total damage image into table data"""
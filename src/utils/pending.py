@@ -0,0 +1,145 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import OperationFailure
+
+from utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+class PendingVerifications:
+    """
+    Submissions waiting for an officer's ✅/❌, keyed by verification message id.
+
+    Every entry is persisted in `pending_verifications` with a TTL index on
+    `created_at`, so outstanding reviews survive restarts and abandoned ones
+    are eventually dropped by MongoDB. Lookups go to an in-memory copy that is
+    rebuilt from the collection at startup.
+    """
+
+    def __init__(self, ttl_seconds: int = None):
+        if ttl_seconds is None:
+            ttl_seconds = get_setting("verification", "pending_ttl_hours", 72) * 3600
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.collection = None
+        self.entries = {}            # message id -> submission
+        self.counters = {"added": 0, "resolved": 0, "expired": 0}
+
+    # ------------------------------------------------------------------ loading
+
+    async def ensure_index(self, db):
+        """Create (or retune) the TTL index that expires abandoned submissions."""
+        collection = db.pending_verifications
+        seconds = int(self.ttl.total_seconds())
+        try:
+            await collection.create_index("created_at", expireAfterSeconds=seconds)
+        except OperationFailure:
+            # Index exists with a different TTL
+            await db.command({
+                "collMod": collection.name,
+                "index": {"keyPattern": {"created_at": 1}, "expireAfterSeconds": seconds}
+            })
+
+    async def load(self, db):
+        """Bind to the database and rebuild the hot cache from unexpired entries."""
+        self.collection = db.pending_verifications
+        await self.ensure_index(db)
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        self.entries = {}
+        async for document in self.collection.find({"created_at": {"$gt": cutoff}}):
+            self.entries[document["_id"]] = self._from_document(document)
+        logger.info(f"Pending verifications loaded: {len(self.entries)}")
+
+    def _from_document(self, document: dict) -> dict:
+        entry = {key: value for key, value in document.items() if key != "_id"}
+        if isinstance(entry.get("value"), list):
+            entry["value"] = tuple(entry["value"])
+        created = entry.get("created_at")
+        if created is not None and created.tzinfo is None:
+            entry["created_at"] = created.replace(tzinfo=timezone.utc)
+        return entry
+
+    # ------------------------------------------------------------------ queue
+
+    async def add(self, message_id: int, entry: dict):
+        entry = dict(entry, created_at=datetime.now(timezone.utc))
+        await self.collection.replace_one(
+            {"_id": message_id},
+            dict(entry, value=list(entry["value"])),
+            upsert=True
+        )
+        self.entries[message_id] = entry
+        self.counters["added"] += 1
+
+    async def annotate(self, message_id: int, fields: dict):
+        """Attach extra data (e.g. OCR results) to a pending submission."""
+        entry = self.entries.get(message_id)
+        if entry is None:
+            return
+        entry.update(fields)
+        await self.collection.update_one({"_id": message_id}, {"$set": fields})
+
+    def get(self, message_id: int):
+        """The pending submission for a message, or None. Never touches the database."""
+        entry = self.entries.get(message_id)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            # The TTL monitor removes the document on its own schedule
+            del self.entries[message_id]
+            self.counters["expired"] += 1
+            return None
+        return entry
+
+    async def pop(self, message_id: int):
+        """Remove a submission once it has been approved or rejected."""
+        entry = self.entries.pop(message_id, None)
+        await self.collection.delete_one({"_id": message_id})
+        if entry is not None:
+            self.counters["resolved"] += 1
+        return entry
+
+    async def pop_many(self, message_ids: list) -> list:
+        """Remove several resolved submissions with a single delete."""
+        entries = [self.entries.pop(message_id, None) for message_id in message_ids]
+        await self.collection.delete_many({"_id": {"$in": list(message_ids)}})
+        self.counters["resolved"] += sum(entry is not None for entry in entries)
+        return entries
+
+    def for_guild(self, guild_name: str, limit: int = None) -> list:
+        """Unexpired submissions for a guild as (message id, entry), oldest first."""
+        self.prune()
+        entries = sorted(
+            ((message_id, entry) for message_id, entry in self.entries.items() if entry["guild"] == guild_name),
+            key=lambda item: item[1]["created_at"]
+        )
+        return entries[:limit] if limit else entries
+
+    def _expired(self, entry: dict, now: datetime = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        return entry["created_at"] + self.ttl <= now
+
+    def prune(self) -> int:
+        """Drop expired entries from memory; returns how many were dropped."""
+        now = datetime.now(timezone.utc)
+        expired = [message_id for message_id, entry in self.entries.items() if self._expired(entry, now)]
+        for message_id in expired:
+            del self.entries[message_id]
+        self.counters["expired"] += len(expired)
+        return len(expired)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self) -> dict:
+        self.prune()
+        oldest = min((entry["created_at"] for entry in self.entries.values()), default=None)
+        age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0
+        return {
+            "depth": len(self.entries),
+            "oldest_age_s": round(age),
+            "ttl_hours": round(self.ttl.total_seconds() / 3600, 2),
+            **self.counters
+        }
+
+# Bot-wide instance, also exposed as bot.pending
+pending_verifications = PendingVerifications()
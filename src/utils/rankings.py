@@ -0,0 +1,74 @@
+from sortedcontainers import SortedList
+
+BOARDS = ["total", "rvd", "aod", "la"]
+
+class SortedRanking:
+    """
+    Names ordered by score (highest first), updated incrementally.
+
+    Keys are kept in a SortedList of (-score, name), so an update (one remove
+    plus one add) and a member's position are both O(log n).
+    """
+
+    def __init__(self):
+        self._keys = SortedList()
+        self._scores = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _remove_key(self, name: str):
+        score = self._scores.pop(name, None)
+        if score is None:
+            return
+        self._keys.discard((-score, name))
+
+    def update(self, name: str, score):
+        if self._scores.get(name) == score:
+            return
+        self._remove_key(name)
+        self._scores[name] = score
+        self._keys.add((-score, name))
+
+    def remove(self, name: str):
+        self._remove_key(name)
+
+    def score_of(self, name: str):
+        return self._scores.get(name)
+
+    def rank_of(self, name: str):
+        """1-based position of a name, or None if it is not ranked."""
+        score = self._scores.get(name)
+        if score is None:
+            return None
+        return self._keys.bisect_left((-score, name)) + 1
+
+    def top(self, n: int) -> list:
+        """The best `n` entries as (rank, name, score)."""
+        return [(index + 1, name, -negated) for index, (negated, name) in enumerate(self._keys.islice(0, n))]
+
+class GlobalLeaderboard:
+    """Cross-guild rankings by total damage and per boss."""
+
+    def __init__(self):
+        self.boards = {board: SortedRanking() for board in BOARDS}
+        self.guild_of = {}
+
+    def update_member(self, name: str, guild: str, damages: dict):
+        self.guild_of[name] = guild
+        values = {boss: damages.get(boss, 0) or 0 for boss in BOARDS if boss != "total"}
+        self.boards["total"].update(name, sum(values.values()))
+        for boss, value in values.items():
+            self.boards[boss].update(name, value)
+
+    def remove_member(self, name: str):
+        self.guild_of.pop(name, None)
+        for board in self.boards.values():
+            board.remove(name)
+
+    def top(self, board: str = "total", n: int = 25) -> list:
+        """The best `n` members on a board as (rank, name, guild, score)."""
+        return [(rank, name, self.guild_of.get(name), score) for rank, name, score in self.boards[board].top(n)]
+
+    def rank_of(self, name: str, board: str = "total"):
+        return self.boards[board].rank_of(name)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+RENDERERS = ("chrome", "pillow")
+
+def get_renderer(name: str = None):
+    """Return the create_damage_board implementation for a renderer name."""
+    name = name or get_setting("leaderboard", "renderer", "chrome")
+    if name == "chrome":
+        from utils.leaderboard_chrome import create_damage_board
+    elif name == "pillow":
+        from utils.leaderboard_pillow import create_damage_board
+    else:
+        raise ValueError(f"Unknown leaderboard renderer: {name} (expected one of {RENDERERS})")
+    return create_damage_board
+
+class RenderService:
+    """
+    Awaitable front end for leaderboard rendering.
+
+    Renders run on a bounded thread pool so Selenium round-trips never block
+    the event loop. At most `max_workers + max_queue` renders are admitted at
+    once; further callers wait for a slot.
+    """
+
+    def __init__(self, max_workers: int = None, max_queue: int = None, renderer: str = None):
+        self.name = renderer or get_setting("leaderboard", "renderer", "chrome")
+        self.create_damage_board = get_renderer(self.name)
+        self.max_workers = max_workers or get_setting("leaderboard", "render_workers", None) \
+            or get_setting("leaderboard", "chrome_pool_size", 2)
+        self.max_queue = max_queue or get_setting("leaderboard", "render_queue_size", 10)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="leaderboard-render"
+        )
+        self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Renders admitted or waiting for admission that have not started yet."""
+        return self.waiting
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "last_latency": self.last_latency,
+            "avg_latency": self.total_latency / finished if finished else 0.0,
+            "max_latency": self.max_latency
+        }
+
+    def _run(self, loop, job: dict, guild_name: str, guild_data: dict):
+        # Executor thread: counters are only touched on the loop thread
+        try:
+            loop.call_soon_threadsafe(self._started, job)
+        except RuntimeError:  # loop already closed during shutdown
+            pass
+        return self.create_damage_board(guild_name, guild_data)
+
+    def _started(self, job: dict):
+        if job["state"] == "waiting":
+            job["state"] = "running"
+            self.waiting -= 1
+            self.running += 1
+
+    def _finished(self, job: dict):
+        if job["state"] == "waiting":
+            self.waiting -= 1
+        elif job["state"] == "running":
+            self.running -= 1
+        job["state"] = "done"
+
+    async def render(self, guild_name: str, guild_data: dict):
+        """Render a guild's damage board without blocking the event loop."""
+        start = time.perf_counter()
+        # Waiting until the job starts on a worker; a job cancelled before then never runs
+        job = {"state": "waiting"}
+        self.waiting += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, self._run, loop, job, guild_name, guild_data)
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+        finally:
+            self._finished(job)
+            latency = time.perf_counter() - start
+            self.last_latency = latency
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            logger.info(
+                f"Rendered leaderboard for {guild_name} in {latency:.2f}s "
+                f"(queue depth {self.waiting}, running {self.running})"
+            )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
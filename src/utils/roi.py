@@ -0,0 +1,63 @@
+"""
+Where the boss name, level and total damage sit on a raid result screen.
+
+Full-screen captures (phones and PCs, 16:9 up to ~2.2:1) share one layout
+anchored to the screen height: the results band is horizontally centered
+between 55% and 88% of the height. Anything else (usually a hand-cropped
+screenshot) has no fixed layout and is located with a cheap first pass on a
+downscaled copy instead.
+"""
+
+# (min aspect ratio, max aspect ratio, top, bottom, half width), vertical
+# values as fractions of the image height; half width is measured from the
+# horizontal center, also in units of height
+LAYOUTS = [
+    (1.7, 2.4, 0.55, 0.88, 0.42),
+]
+
+# Height of the downscaled copy used by the first pass
+FIRST_PASS_HEIGHT = 480
+# Padding around first-pass hits, as a fraction of the image height
+FIRST_PASS_PADDING = 0.04
+
+def clamp_box(box, width: int, height: int):
+    left, top, right, bottom = box
+    return (
+        max(0, int(left)), max(0, int(top)),
+        min(width, int(round(right))), min(height, int(round(bottom)))
+    )
+
+def layout_box(width: int, height: int):
+    """Template ROI (left, top, right, bottom) for an image size, or None if no layout matches."""
+    ratio = width / height
+    for min_ratio, max_ratio, top, bottom, half_width in LAYOUTS:
+        if min_ratio <= ratio <= max_ratio:
+            center = width / 2
+            return clamp_box(
+                (center - half_width * height, top * height, center + half_width * height, bottom * height),
+                width, height
+            )
+    return None
+
+def first_pass_scale(height: int) -> float:
+    """Downscale factor for the first pass (never upscales)."""
+    return min(1.0, FIRST_PASS_HEIGHT / height)
+
+def union_box(quads, scale: float, width: int, height: int):
+    """
+    Padded bounding box, in full-resolution pixels, around OCR quads found on
+    a copy downscaled by `scale`. None if there are no quads.
+    """
+    points = [point for quad in quads for point in quad]
+    if not points:
+        return None
+    padding = FIRST_PASS_PADDING * height
+    return clamp_box(
+        (
+            min(x for x, _ in points) / scale - padding,
+            min(y for _, y in points) / scale - padding,
+            max(x for x, _ in points) / scale + padding,
+            max(y for _, y in points) / scale + padding
+        ),
+        width, height
+    )
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    """
+    Per-guild debounced refresh scheduler.
+
+    `mark_dirty` schedules `refresh(guild_name)` to run once `window` seconds
+    later. Further marks for the same guild inside that window are collapsed
+    into the pending refresh, and the refresh reads whatever state is current
+    when it fires. Refreshes for one guild never overlap.
+    """
+
+    def __init__(self, refresh, window: float = 5.0):
+        self.refresh = refresh
+        self.window = window
+        self._pending = {}
+        self._locks = {}
+        self.marks = 0
+        self.refreshes = 0
+        self.collapsed = 0
+        self.failed = 0
+
+    def mark_dirty(self, guild_name: str):
+        """Request a refresh for a guild, coalescing with any pending one."""
+        self.marks += 1
+        if guild_name in self._pending:
+            self.collapsed += 1
+            return
+        self._pending[guild_name] = asyncio.create_task(self._run(guild_name))
+
+    async def _run(self, guild_name: str):
+        await asyncio.sleep(self.window)
+        lock = self._locks.setdefault(guild_name, asyncio.Lock())
+        async with lock:
+            # Marks arriving from here on need a fresh refresh
+            self._pending.pop(guild_name, None)
+            try:
+                await self.refresh(guild_name)
+                self.refreshes += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Scheduled refresh for {guild_name} failed: {e}")
+
+    async def flush(self):
+        """Wait for every pending refresh to finish."""
+        while self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def cancel_all(self):
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "marks": self.marks,
+            "refreshes": self.refreshes,
+            "collapsed": self.collapsed,
+            "failed": self.failed
+        }
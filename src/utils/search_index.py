@@ -0,0 +1,122 @@
+import bisect
+import heapq
+
+# Match quality, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+def ngrams(text: str, n: int) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class NameIndex:
+    """
+    Incrementally maintained search index over a set of names.
+
+    Prefix lookups use a sorted list and bisect; substring lookups use an
+    n-gram (n <= 3) posting map, so a query only ever inspects names that
+    share its rarest n-gram. When there are too few substring hits the index
+    falls back to trigram similarity, which tolerates typos.
+    """
+
+    def __init__(self, names=()):
+        self._names = {}        # lowercased -> original spelling
+        self._sorted = []       # lowercased names, sorted
+        self._grams = {}        # 1-, 2- and 3-grams -> set of lowercased names
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name.lower() in self._names
+
+    def _grams_of(self, key: str) -> set:
+        grams = set()
+        for n in (1, 2, 3):
+            grams |= ngrams(key, n)
+        return grams
+
+    def add(self, name: str):
+        key = name.lower()
+        if key in self._names:
+            self._names[key] = name
+            return
+        self._names[key] = name
+        bisect.insort(self._sorted, key)
+        for gram in self._grams_of(key):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, name: str):
+        key = name.lower()
+        if self._names.pop(key, None) is None:
+            return
+        index = bisect.bisect_left(self._sorted, key)
+        if index < len(self._sorted) and self._sorted[index] == key:
+            del self._sorted[index]
+        for gram in self._grams_of(key):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._grams[gram]
+
+    def _prefix_matches(self, query: str, limit: int) -> list:
+        start = bisect.bisect_left(self._sorted, query)
+        matches = []
+        for key in self._sorted[start:]:
+            if not key.startswith(query) or len(matches) >= limit:
+                break
+            matches.append(key)
+        return matches
+
+    def _substring_candidates(self, query: str) -> set:
+        if len(query) <= 3:
+            return self._grams.get(query, set())
+        postings = [self._grams.get(gram, set()) for gram in ngrams(query, 3)]
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {key for key in candidates if query in key}
+
+    def _fuzzy_candidates(self, query: str) -> dict:
+        grams = ngrams(query, 3)
+        overlap = {}
+        for gram in grams:
+            for key in self._grams.get(gram, ()):
+                overlap[key] = overlap.get(key, 0) + 1
+        scores = {}
+        for key, shared in overlap.items():
+            union = len(grams) + max(len(key) - 2, 0) - shared
+            score = shared / union if union else 0
+            if score >= 0.2:
+                scores[key] = score
+        return scores
+
+    def search(self, query: str, limit: int = 25) -> list:
+        """Best `limit` names for `query`: exact, prefix, word prefix, substring, then fuzzy."""
+        query = query.lower().strip()
+        if not query:
+            return [self._names[key] for key in self._sorted[:limit]]
+
+        ranked = {}
+        for key in self._prefix_matches(query, limit):
+            ranked[key] = (EXACT if key == query else PREFIX, 0, len(key), key)
+
+        if len(ranked) < limit:
+            for key in self._substring_candidates(query):
+                if key in ranked:
+                    continue
+                position = key.find(query)
+                boundary = not key[position - 1].isalnum()
+                ranked[key] = (WORD_PREFIX if boundary else SUBSTRING, position, len(key), key)
+
+        if len(ranked) < limit and len(query) >= 3:
+            for key, score in self._fuzzy_candidates(query).items():
+                if key not in ranked:
+                    ranked[key] = (FUZZY, -score, len(key), key)
+
+        best = heapq.nsmallest(limit, ranked.values())
+        return [self._names[rank[-1]] for rank in best]
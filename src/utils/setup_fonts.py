@@ -0,0 +1,37 @@
+from box import Timer
+timer = Timer()
+from box import markup
+import os
+import urllib.request
+
+# Variable-weight builds from the google/fonts repository (SIL Open Font License)
+FONT_URLS = {
+    "Inter.ttf": "https://raw.githubusercontent.com/google/fonts/main/ofl/inter/Inter%5Bopsz,wght%5D.ttf",
+    "Vollkorn.ttf": "https://raw.githubusercontent.com/google/fonts/main/ofl/vollkorn/Vollkorn%5Bwght%5D.ttf",
+}
+FONT_DIR = 'assets/fonts'
+
+def setup_fonts(font_dir=FONT_DIR):
+    """Download the leaderboard fonts into assets/fonts so renders never hit the network."""
+    os.makedirs(font_dir, exist_ok=True)
+    paths = []
+    for filename, url in FONT_URLS.items():
+        path = os.path.join(font_dir, filename)
+        if os.path.exists(path):
+            print(f"Already present: {path}")
+        else:
+            print(f"Downloading {url}...")
+            with urllib.request.urlopen(url) as response:
+                data = response.read()
+            with open(path, 'wb') as f:
+                f.write(data)
+            print(f"Downloaded {filename} to {path}")
+        paths.append(path)
+    return paths
+
+def main():
+    setup_fonts()
+    print(markup("[bold green]Fonts ready[/]"))
+
+if __name__ == "__main__":
+    main()
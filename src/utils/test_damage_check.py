@@ -0,0 +1,20 @@
+from damage_check import damage_tolerance, damage_matches
+
+def test_tolerance_follows_typed_precision():
+    """Tolerance is half a unit of the last typed digit"""
+    assert damage_tolerance("4.01b") == 0.5 * 1e9 * 0.01
+    assert damage_tolerance("8880M") == 0.5 * 1e6
+    assert damage_tolerance("4012345678") == 0.5
+
+def test_abbreviated_input_matches_full_screenshot_value():
+    """"4.01b" agrees with 4,012,345,678 but not with 4,020,000,000"""
+    typed = float("4.01") * 1e9
+    assert damage_matches("4.01b", typed, 4_012_345_678)
+    assert damage_matches("4.01b", typed, 4_006_000_000)
+    assert not damage_matches("4.01b", typed, 4_020_000_000)
+
+def test_raw_input_needs_an_exact_match():
+    """Fully typed numbers only match themselves"""
+    assert damage_matches("4012345678", 4012345678.0, 4_012_345_678)
+    assert not damage_matches("4012345678", 4012345678.0, 4_012_345_679)
+    assert not damage_matches("4.01b", 4.01e9, None)
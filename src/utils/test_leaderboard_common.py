@@ -0,0 +1,39 @@
+import os
+
+import leaderboard_common
+from leaderboard_common import board_cache_key, get_player_stats
+
+def use_assets(monkeypatch, tmp_path):
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    for path in (tmp_path / "template.html", tmp_path / "bg.png", fonts / "Inter.ttf"):
+        path.write_bytes(b"v1")
+    monkeypatch.setattr(leaderboard_common, "TEMPLATE_PATH", str(tmp_path / "template.html"))
+    monkeypatch.setattr(leaderboard_common, "BACKGROUND_PATH", str(tmp_path / "bg.png"))
+    monkeypatch.setattr(leaderboard_common, "FONT_DIR", str(fonts))
+    return fonts
+
+def rows():
+    return get_player_stats({"members": {"kim": {"damages": {"rvd": 1, "aod": 2, "la": 3}}}})
+
+def test_key_depends_on_renderer(monkeypatch, tmp_path):
+    """Chrome and Pillow boards never share a cached image"""
+    use_assets(monkeypatch, tmp_path)
+    assert board_cache_key("chrome", "G", rows()) == board_cache_key("chrome", "G", rows())
+    assert board_cache_key("chrome", "G", rows()) != board_cache_key("pillow", "G", rows())
+
+def test_key_changes_with_fonts_and_background(monkeypatch, tmp_path):
+    """Replacing a font or the background invalidates the posted board"""
+    fonts = use_assets(monkeypatch, tmp_path)
+    before = board_cache_key("pillow", "G", rows())
+
+    font = fonts / "Inter.ttf"
+    font.write_bytes(b"v2")
+    os.utime(font, ns=(1, 1))
+    after_font = board_cache_key("pillow", "G", rows())
+    assert after_font != before
+
+    background = tmp_path / "bg.png"
+    background.write_bytes(b"v2")
+    os.utime(background, ns=(1, 1))
+    assert board_cache_key("pillow", "G", rows()) != after_font
@@ -0,0 +1,46 @@
+import json
+
+from member_sheet import parse_member_rows
+
+def test_csv_rows_parse_damage_formats():
+    """Abbreviated and raw damages become integer field updates"""
+    content = b"name,rvd,aod,la,guild\nkim,8.88b,8880M,,\nlee,1000,,,Other\n"
+    rows, errors = parse_member_rows(content, "members.csv", "StarCookiez")
+    assert errors == []
+    assert rows == [
+        {"line": 2, "guild": "StarCookiez", "name": "kim", "fields": {"damages.rvd": 8_880_000_000, "damages.aod": 8_880_000_000}},
+        {"line": 3, "guild": "Other", "name": "lee", "fields": {"damages.rvd": 1000}},
+    ]
+
+def test_bad_rows_are_reported_per_line():
+    """Missing names, duplicates and unparseable damages skip only their own row"""
+    content = b"name,rvd\nkim,1b\n,5\nkim,2b\nlee,lots\nmoe,inf\nsam,1e400\nzoe,3m\n"
+    rows, errors = parse_member_rows(content, "members.csv", "G")
+    assert [row["name"] for row in rows] == ["kim", "zoe"]
+    assert errors == [
+        (3, "Missing name"),
+        (4, "Duplicate row for kim"),
+        (5, "Invalid damage value for lee"),
+        (6, "Invalid damage value for moe"),
+        (7, "Invalid damage value for sam"),
+    ]
+
+def test_json_rejects_non_scalar_damages():
+    """Lists and objects as damage values are row errors, not exceptions"""
+    content = json.dumps({"members": [
+        {"name": "kim", "rvd": [1]},
+        {"name": "lee", "aod": {}},
+        {"name": "moe", "la": 5000000, "last_donation": "2024-01-01"},
+        "not a member",
+    ]}).encode()
+    rows, errors = parse_member_rows(content, "members.json", "G")
+    assert rows == [{"line": 3, "guild": "G", "name": "moe", "fields": {"damages.la": 5000000, "last_donation": "2024-01-01"}}]
+    assert errors == [
+        (1, "Invalid damage value for kim"),
+        (2, "Invalid damage value for lee"),
+        (4, "Row is not an object"),
+    ]
+
+def test_invalid_json_is_one_error():
+    rows, errors = parse_member_rows(b"{nope", "members.json", "G")
+    assert rows == [] and errors[0][0] == 0
@@ -0,0 +1,40 @@
+from rankings import SortedRanking, GlobalLeaderboard
+
+def test_ranking_orders_by_score_then_name():
+    """Higher scores rank first; ties are broken by name"""
+    ranking = SortedRanking()
+    ranking.update("b", 10)
+    ranking.update("a", 10)
+    ranking.update("c", 30)
+    assert ranking.top(3) == [(1, "c", 30), (2, "a", 10), (3, "b", 10)]
+    assert ranking.rank_of("b") == 3
+
+def test_update_moves_a_single_entry():
+    """Updating one score moves only that name and keeps the list sorted"""
+    ranking = SortedRanking()
+    for index, name in enumerate(["a", "b", "c", "d"]):
+        ranking.update(name, index)
+    ranking.update("a", 100)
+    assert [name for _, name, _ in ranking.top(4)] == ["a", "d", "c", "b"]
+    assert len(ranking) == 4
+
+def test_remove_unranks_name():
+    """Removed names disappear from the ranking"""
+    ranking = SortedRanking()
+    ranking.update("a", 1)
+    ranking.remove("a")
+    ranking.remove("missing")
+    assert ranking.rank_of("a") is None
+    assert ranking.top(5) == []
+
+def test_global_leaderboard_tracks_total_and_bosses():
+    """Per-boss and total boards are maintained across guilds"""
+    board = GlobalLeaderboard()
+    board.update_member("Marccc", "StarCookiez", {"rvd": 4, "aod": 4, "la": 8})
+    board.update_member("Bill0w", "CelestialCookiez", {"rvd": 5, "aod": 3, "la": 7})
+    assert board.top("total", 1) == [(1, "Marccc", "StarCookiez", 16)]
+    assert board.top("rvd", 1) == [(1, "Bill0w", "CelestialCookiez", 5)]
+    board.update_member("Bill0w", "CelestialCookiez", {"rvd": 5, "aod": 3, "la": 9})
+    assert board.rank_of("Bill0w") == 1
+    board.remove_member("Bill0w")
+    assert board.rank_of("Bill0w", "rvd") is None
@@ -0,0 +1,18 @@
+from roi import layout_box, union_box, first_pass_scale
+
+def test_full_screen_captures_use_the_layout():
+    """16:9 and ~2.2:1 screens map to the centered results band"""
+    assert layout_box(1920, 1080) == (506, 594, 1414, 950)
+    assert layout_box(2400, 1080) == (746, 594, 1654, 950)
+
+def test_cropped_screenshots_have_no_layout():
+    """Hand-cropped screenshots fall through to the first pass"""
+    assert layout_box(1070, 863) is None
+
+def test_union_box_scales_back_and_pads():
+    """First-pass quads are mapped to full resolution, padded and clamped"""
+    scale = first_pass_scale(960)
+    assert scale == 0.5
+    quads = [[[100, 300], [200, 300], [200, 320], [100, 320]], [[90, 330], [250, 330], [250, 350], [90, 350]]]
+    assert union_box(quads, scale, 1200, 960) == (141, 561, 538, 738)
+    assert union_box([], scale, 1200, 960) is None
@@ -0,0 +1,52 @@
+import asyncio
+from scheduling import RefreshScheduler
+
+def test_marks_within_window_are_collapsed():
+    """Many marks for one guild inside the window produce one refresh"""
+    calls = []
+
+    async def refresh(guild_name):
+        calls.append(guild_name)
+
+    async def run():
+        scheduler = RefreshScheduler(refresh, window=0.05)
+        for _ in range(20):
+            scheduler.mark_dirty("StarCookiez")
+        scheduler.mark_dirty("CelestialCookiez")
+        await scheduler.flush()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert sorted(calls) == ["CelestialCookiez", "StarCookiez"]
+    assert scheduler.collapsed == 19
+    assert scheduler.stats()["refreshes"] == 2
+
+def test_mark_after_refresh_starts_schedules_again():
+    """A mark arriving while a refresh runs triggers one more refresh"""
+    calls = []
+
+    async def run():
+        async def refresh(guild_name):
+            calls.append(guild_name)
+            if len(calls) == 1:
+                scheduler.mark_dirty(guild_name)
+
+        scheduler = RefreshScheduler(refresh, window=0.01)
+        scheduler.mark_dirty("StarCookiez")
+        await scheduler.flush()
+
+    asyncio.run(run())
+    assert calls == ["StarCookiez", "StarCookiez"]
+
+def test_failed_refresh_is_counted():
+    """Errors in the refresh callback are logged and counted, not raised"""
+    async def refresh(guild_name):
+        raise ValueError("boom")
+
+    async def run():
+        scheduler = RefreshScheduler(refresh, window=0)
+        scheduler.mark_dirty("StarCookiez")
+        await scheduler.flush()
+        return scheduler
+
+    assert asyncio.run(run()).failed == 1
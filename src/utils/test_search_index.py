@@ -0,0 +1,39 @@
+from search_index import NameIndex
+
+NAMES = ["Marccc", "MrKimKong", "KimAlt", "Kimi392", "rinneganfinder", "Roast Duck", "Sock", "SnowyCan"]
+
+def test_prefix_ranks_before_substring():
+    """Prefix hits come first, then substring hits, case-insensitively"""
+    index = NameIndex(NAMES)
+    assert index.search("kim") == ["KimAlt", "Kimi392", "MrKimKong"]
+
+def test_exact_match_first():
+    """An exact name outranks longer names sharing its prefix"""
+    index = NameIndex(["Sockpuppet", "Sock", "Socks"])
+    assert index.search("sock")[0] == "Sock"
+
+def test_word_prefix_ranks_before_inner_substring():
+    """A match at a word boundary beats one in the middle of a word"""
+    index = NameIndex(["Roast Duck", "Educk"])
+    assert index.search("duck") == ["Roast Duck", "Educk"]
+
+def test_results_are_top_k_limited():
+    """Results never exceed the limit, even for an empty query"""
+    index = NameIndex(f"Player {i}" for i in range(100))
+    assert len(index.search("", limit=25)) == 25
+    assert len(index.search("play", limit=25)) == 25
+
+def test_fuzzy_fallback_tolerates_typos():
+    """With no substring hits, names sharing trigrams are suggested"""
+    index = NameIndex(NAMES)
+    assert index.search("rinegan")[0] == "rinneganfinder"
+
+def test_incremental_add_and_remove():
+    """Adds and removals are reflected without rebuilding"""
+    index = NameIndex(NAMES)
+    index.add("Kimchi")
+    assert "Kimchi" in index.search("kim")
+    index.remove("KimAlt")
+    assert "KimAlt" not in index.search("kim")
+    assert "KimAlt" not in index
+    assert len(index) == len(NAMES)